@@ -2,11 +2,14 @@ import streamlit as st
 import re
 import json
 import os
+import hashlib
 from itertools import islice
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
 from langchain_community.tools import DuckDuckGoSearchRun
 from langchain_openai import ChatOpenAI
-from retailers import get_product_links, check_disc_tree_stock
-from flight_chart import generate_flight_path, get_flight_stats, FLIGHT_NUMBER_GUIDE, calculate_arm_speed_factor
+from retailers import get_product_links_markdown, check_disc_tree_stock_many
+from flight_chart import generate_flight_path, generate_flight_paths, precompute_flight_paths, get_flight_stats, FLIGHT_NUMBER_GUIDE, calculate_arm_speed_factor, transform_chart_paths
 from knowledge_base import DiscGolfKnowledgeBase
 from feedback_system import FeedbackSystem
 
@@ -31,6 +34,204 @@ POPULAR_DISCS = [
     'Photon', 'Wave', 'Insanity', 'Relay', 'Crave',
 ]
 
+# Flight chart levels: arm speed <-> label shown in the UI
+NIVEAU_LABELS = {'slow': 'Begynder', 'normal': 'Øvet', 'fast': 'Pro'}
+NIVEAU_ARM_SPEEDS = {label: arm_speed for arm_speed, label in NIVEAU_LABELS.items()}
+
+# Chat history limits: older messages are only rendered on request, and the
+# stored history is capped so reruns don't slow down in long conversations
+MAX_VISIBLE_MESSAGES = 20
+MAX_STORED_MESSAGES = 100
+
+# Token budget for the recent conversation included in AI prompts
+CONTEXT_TOKEN_BUDGET = 1500
+
+# Precompiled patterns used when parsing user input and AI responses
+BOLD_NAME_RE = re.compile(r'\*\*([A-Za-z0-9\s\-]+)\*\*')
+BOLD_TEXT_RE = re.compile(r'\*\*([^*]+)\*\*')
+NUMBER_RE = re.compile(r'\d+')
+# Flight number fields rewritten by fix_flight_numbers_in_response
+FLIGHT_FIELD_RES = (
+    re.compile(r'(Speed[:\s]+)\d+', re.IGNORECASE),
+    re.compile(r'(Glide[:\s]+)\d+', re.IGNORECASE),
+    re.compile(r'(Turn[:\s]+)-?\d+\.?\d*', re.IGNORECASE),
+    re.compile(r'(Fade[:\s]+)\d+\.?\d*', re.IGNORECASE),
+)
+FLIGHT_NUMBERS_RE = re.compile(r'(Flight[:\s]+)\d+/\d+/-?\d+\.?\d*/\d+\.?\d*', re.IGNORECASE)
+
+# Words in **bold** AI text that are never disc names (brands, headings, flight terms)
+SKIP_WORDS = frozenset({
+    'flight', 'numbers', 'fordele', 'ulemper', 'plastik', 'sammenligning',
+    'disc', 'discs', 'speed', 'glide', 'turn', 'fade', 'premium', 'base',
+    'distance', 'driver', 'putter', 'midrange', 'fairway', 'innova',
+    'discraft', 'discmania', 'latitude', 'mvp', 'axiom', 'kastaplast',
+    'westside', 'dynamic', 'navn', 'mærke', 'af', 'anbefaling', 'køb', 'vent',
+    'bemærk', 'lige', 'lidt', 'prodigy', 'lone', 'star', 'streamline',
+    'thought', 'space', 'clash', 'dga', 'viking', 'yikun', 'gateway',
+})
+
+# Brand keywords the user can mention in their extra wishes, mapped to the
+# manufacturer name. Listed in priority order: the first one mentioned wins.
+BRAND_MAP = {
+    "mvp": "MVP",
+    "axiom": "Axiom",
+    "streamline": "Streamline",
+    "innova": "Innova",
+    "discraft": "Discraft",
+    "latitude": "Latitude 64",
+    "lat64": "Latitude 64",
+    "discmania": "Discmania",
+    "kastaplast": "Kastaplast",
+}
+BRAND_RE = re.compile("|".join(map(re.escape, BRAND_MAP)))
+
+# Keywords meaning the user wants new disc recommendations
+NEW_RECS_KEYWORDS = [
+    'anbefal', 'foreslå', 'alternativ', 'andre discs', 'ny disc', 'nye discs',
+    'jeg vil have', 'jeg skal bruge', 'find mig'
+]
+
+# Keywords meaning the user's message is about plastic; follow-up prompts
+# only carry the plastic guide when one of these appears
+PLASTIC_KEYWORDS = ('plastik', 'plastic', 'premium', 'base')
+
+# Purely informational questions ("hvem vandt VM?", "hvordan kaster man en
+# putter?") get the short general prompt even when they name a disc type
+INFO_QUERY_RE = re.compile(r'\b(hvem vandt|hvordan kaster|hvorfor|historie|regler)\b')
+
+# Speed range (inclusive) for each disc type; other types use 1-14
+DISC_TYPE_SPEED_RANGES = {
+    "Putter": (1, 3),
+    "Midrange": (4, 6),
+    "Fairway driver": (7, 9),
+    "Distance driver": (10, 14)
+}
+
+# Quick disc-type answers in the chat step: a menu number, or a short message
+# containing the keywords (each entry: keywords, disc type, max message length)
+DISC_TYPE_NUMBERS = {"1": "Putter", "2": "Midrange", "3": "Fairway driver", "4": "Distance driver"}
+DISC_TYPE_KEYWORDS = [
+    (("putter",), "Putter", 15),
+    (("midrange",), "Midrange", 20),
+    (("mid-range",), "Midrange", 20),
+    (("fairway",), "Fairway driver", 20),
+    (("distance", "driver"), "Distance driver", 25),
+]
+
+# Free-form prompts that can be answered locally instead of via a full AI search.
+# Checked in order; the first matching pattern decides the intent.
+LOCAL_INTENTS = [
+    (re.compile(r'\bforfra\b', re.IGNORECASE), "reset"),
+    (re.compile(r'^\W*(hej|hejsa|hello|hi|goddag)\W*$', re.IGNORECASE), "greet"),
+    (re.compile(r'\b(flight|flyver|chart|graf|kurve)\b', re.IGNORECASE), "chart"),
+    (re.compile(r'\b(plastik|plastic)\b', re.IGNORECASE), "plastic"),
+]
+
+
+def build_buy_links(disc_names, template):
+    """
+    Buy-link lines for the discs that at least one store sells.
+    
+    `template` is formatted with `disc` and `links` (the store links joined
+    by " | "). Returns dict mapping lowercase disc name to its line.
+    """
+    buy_links = {}
+    for disc in disc_names:
+        if disc and len(disc) >= 2:
+            # Only includes stores that have the disc
+            links = get_product_links_markdown(disc)
+            if links:
+                buy_links[disc.lower()] = template.format(disc=disc, links=links)
+    return buy_links
+
+
+def insert_buy_links(response, buy_links, marker, bold_optional=False):
+    """
+    Insert each disc's buy-link line after the first `marker` line (e.g.
+    "❌ Ulemper:") that follows the disc's **bold** name, in one regex pass.
+    
+    With bold_optional the disc name may also appear without ** around it.
+    Returns (response, lines for discs whose marker line wasn't found).
+    """
+    if not buy_links:
+        return response, []
+    if marker.lower() not in response.lower():
+        # Nothing to anchor on; skip the regex, whose lazy match would scan
+        # to the end of the response from every disc name
+        return response, list(buy_links.values())
+    
+    names_alt = "|".join(re.escape(disc) for disc in sorted(buy_links, key=len, reverse=True))
+    stars = r'\*?\*?' if bold_optional else r'\*\*'
+    pattern = re.compile(
+        rf'{stars}(?P<disc>{names_alt}){stars}.*?{re.escape(marker)}[^\n]*',
+        re.DOTALL | re.IGNORECASE
+    )
+    
+    inserted = set()
+    
+    def add_links(match):
+        disc = match.group('disc').lower()
+        if disc in inserted:
+            return match.group(0)
+        inserted.add(disc)
+        return match.group(0) + buy_links[disc]
+    
+    response = pattern.sub(add_links, response)
+    missing = [line for disc, line in buy_links.items() if disc not in inserted]
+    return response, missing
+
+
+def extract_disc_names(response, limit=3):
+    """
+    Pick disc names from **bold** text in an AI response.
+    
+    Uses the last word of each bold phrase that isn't in SKIP_WORDS
+    (e.g. "**MVP Volt**" -> "Volt") and stops after `limit` unique names.
+    """
+    disc_names = {}
+    for match in BOLD_NAME_RE.findall(response):
+        # Bold text is ASCII only, so the lowercased split lines up word for word
+        words = match.split()
+        for word, word_lower in zip(reversed(words), reversed(match.lower().split())):
+            if len(word) > 2 and word_lower not in SKIP_WORDS:
+                disc_names[word] = None
+                break
+        if len(disc_names) >= limit:
+            break
+    return list(disc_names)
+
+
+def match_disc_type(prompt):
+    """Return the disc type if the prompt just picks one (e.g. "3" or "putter"), else None."""
+    disc_type = DISC_TYPE_NUMBERS.get(prompt.strip())
+    if disc_type:
+        return disc_type
+    prompt_lower = prompt.lower()
+    for keywords, disc_type, max_len in DISC_TYPE_KEYWORDS:
+        if len(prompt) < max_len and all(kw in prompt_lower for kw in keywords):
+            return disc_type
+    return None
+
+
+def classify_local_intent(prompt, has_shown_discs=False):
+    """
+    Classify prompts that don't need the free-form AI search.
+    
+    Returns 'reset', 'greet', 'chart' or 'plastic', or None for open questions.
+    Chart requests only count when there are discs to show, and plastic
+    questions that also ask for new recommendations are left to the AI.
+    """
+    prompt_lower = prompt.lower()
+    for pattern, intent in LOCAL_INTENTS:
+        if not pattern.search(prompt):
+            continue
+        if intent == "chart" and not has_shown_discs:
+            continue
+        if intent == "plastic" and any(kw in prompt_lower for kw in NEW_RECS_KEYWORDS):
+            continue
+        return intent
+    return None
+
 
 def parse_flight_chart_request(prompt):
     """
@@ -131,6 +332,11 @@ def parse_flight_chart_request(prompt):
     return {'is_chart_request': False}
 
 
+def names_by_length(database):
+    """(name, lowercased name) for every disc, longest names first so e.g. "Buzzz SS" wins over "Buzzz"."""
+    return [(name, name.lower()) for name in sorted(database.keys(), key=len, reverse=True)]
+
+
 def filter_wrong_speed_discs(response, database, min_speed, max_speed):
     """
     Remove disc recommendations that don't match the requested speed range.
@@ -142,11 +348,16 @@ def filter_wrong_speed_discs(response, database, min_speed, max_speed):
     current_disc = None
     current_disc_speed = None
     section_start_idx = -1
+    disc_names = names_by_length(database)
     
     for i, line in enumerate(lines):
         # Check if this line starts a new disc section
         disc_found = None
-        for disc_name in sorted(database.keys(), key=len, reverse=True):
+        line_lower = line.lower()
+        for disc_name, name_lower in disc_names:
+            # The pattern can only match if the name occurs in the line
+            if name_lower not in line_lower:
+                continue
             if re.search(rf'\*\*\s*{re.escape(disc_name)}\s*\*\*|###.*{re.escape(disc_name)}|\[\s*{re.escape(disc_name)}\s*\]', line, re.IGNORECASE):
                 disc_found = disc_name
                 break
@@ -192,11 +403,16 @@ def fix_flight_numbers_in_response(response, database):
     lines = response.split('\n')
     current_disc = None
     result_lines = []
+    disc_names = names_by_length(database)
     
     for line in lines:
         # Check if this line defines a new disc (bold name or header)
         disc_found = None
-        for disc_name in sorted(database.keys(), key=len, reverse=True):
+        line_lower = line.lower()
+        for disc_name, name_lower in disc_names:
+            # Both patterns below need the name somewhere in the line
+            if name_lower not in line_lower:
+                continue
             # Check for **DiscName** or ### DiscName patterns
             if re.search(rf'\*\*\s*{re.escape(disc_name)}\s*\*\*|###.*{re.escape(disc_name)}', line, re.IGNORECASE):
                 disc_found = disc_name
@@ -218,16 +434,10 @@ def fix_flight_numbers_in_response(response, database):
             fade = str(disc_data.get('fade', 0))
             
             # Fix Flight: X/X/X/X format
-            line = re.sub(
-                r'(Flight[:\s]+)\d+/\d+/-?\d+\.?\d*/\d+\.?\d*',
-                rf'\g<1>{speed}/{glide}/{turn}/{fade}',
-                line, flags=re.IGNORECASE
-            )
+            line = FLIGHT_NUMBERS_RE.sub(rf'\g<1>{speed}/{glide}/{turn}/{fade}', line)
             # Fix individual values
-            line = re.sub(r'(Speed[:\s]+)\d+', rf'\g<1>{speed}', line, flags=re.IGNORECASE)
-            line = re.sub(r'(Glide[:\s]+)\d+', rf'\g<1>{glide}', line, flags=re.IGNORECASE)
-            line = re.sub(r'(Turn[:\s]+)-?\d+\.?\d*', rf'\g<1>{turn}', line, flags=re.IGNORECASE)
-            line = re.sub(r'(Fade[:\s]+)\d+\.?\d*', rf'\g<1>{fade}', line, flags=re.IGNORECASE)
+            for field_re, value in zip(FLIGHT_FIELD_RES, (speed, glide, turn, fade)):
+                line = field_re.sub(rf'\g<1>{value}', line)
         
         result_lines.append(line)
     
@@ -241,10 +451,12 @@ def fix_manufacturer_names_in_response(response, database):
     when Diamond is actually by Latitude 64).
     """
     result = response
+    result_lower = result.lower()
     
     # Find all disc names mentioned in the response
-    for disc_name in sorted(database.keys(), key=len, reverse=True):
-        if disc_name in database:
+    for disc_name, name_lower in names_by_length(database):
+        # Both patterns need the name in the text; skip the regex work otherwise
+        if name_lower in result_lower:
             correct_manufacturer = database[disc_name].get('manufacturer', '')
             if not correct_manufacturer:
                 continue
@@ -254,19 +466,23 @@ def fix_manufacturer_names_in_response(response, database):
             pattern1 = rf'(###\s*\*\*)[^*\n]*?{re.escape(disc_name)}\s*\*\*(\s+af\s+)[A-Za-z0-9\s]+?(?=\n|$|-)'
             if re.search(pattern1, result, re.IGNORECASE):
                 result = re.sub(pattern1, rf'\g<1>{disc_name}**\g<2>{correct_manufacturer}', result, flags=re.IGNORECASE)
+                result_lower = result.lower()
             
             # Pattern 2: Fix just "**DiscName** af WrongManufacturer" (no prefix issue)
             pattern2 = rf'(\*\*{re.escape(disc_name)}\*\*\s+af\s+)[A-Za-z0-9\s]+?(?=\n|$|-)'
             if re.search(pattern2, result, re.IGNORECASE):
                 result = re.sub(pattern2, rf'\g<1>{correct_manufacturer}', result, flags=re.IGNORECASE)
+                result_lower = result.lower()
     
     return result
 
 
-def handle_free_form_question(prompt, user_prefs=None):
+def handle_free_form_question(prompt, user_prefs=None, placeholder=None):
     """
     Handle any free-form disc golf question using AI + web search.
     
+    If `placeholder` is given, the AI answer is streamed into it as it arrives.
+    
     Returns AI response with disc recommendations.
     """
     if user_prefs is None:
@@ -418,22 +634,18 @@ def handle_free_form_question(prompt, user_prefs=None):
     else:
         search_query = f"disc golf recommendation {search_terms}"
     
-    # ==== KNOWLEDGE BASE CONTEXT ====
-    kb_context = ""
-    if kb_enabled and kb:
+    # Knowledge base lookup and web search are independent network calls:
+    # query the knowledge base in a worker thread while the search runs here
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        kb_future = pool.submit(get_kb_context, prompt) if kb_enabled and kb else None
+        
+        # Web search
         try:
-            kb_results = kb.get_context_for_query(prompt, max_results=3)
-            if kb_results and kb_results != "No relevant information found in knowledge base.":
-                kb_context = f"\n\nRELEVANTE REDDIT DISKUSSIONER:\n{kb_results}"
-        except Exception as e:
-            print(f"Error accessing knowledge base: {e}")
-            kb_context = ""
-    
-    # Web search
-    try:
-        search_results = search.run(search_query)[:4000]
-    except Exception:
-        search_results = ""
+            search_results = cached_search(search_query)
+        except Exception:
+            search_results = ""
+        
+        kb_context = kb_future.result() if kb_future else ""
     
     # Get sample discs from database for context
     # First, prioritize discs that are currently shown (from chart comparison)
@@ -479,8 +691,7 @@ def handle_free_form_question(prompt, user_prefs=None):
                 continue
         # Otherwise filter by disc type
         elif disc_type:
-            speed_ranges = {"Putter": (1, 3), "Midrange": (4, 6), "Fairway driver": (7, 9), "Distance driver": (10, 14)}
-            min_s, max_s = speed_ranges.get(disc_type, (1, 14))
+            min_s, max_s = DISC_TYPE_SPEED_RANGES.get(disc_type, (1, 14))
             if not (min_s <= speed <= max_s):
                 continue
         
@@ -489,29 +700,31 @@ def handle_free_form_question(prompt, user_prefs=None):
         if len(sample_discs) >= 35:
             break
     
-    # Then add other discs from database to fill up to 35 total
+    # Then add other discs from the first 200 in the database to fill up to 35 total
     if len(sample_discs) < 35:
-        for name, data in islice(DISC_DATABASE.items(), 200):
+        cols = load_disc_columns()
+        speeds = cols["speed"][:200]
+        mask = np.ones(len(speeds), dtype=bool)
+        
+        # Filter by skill level
+        if skill_level == "beginner":
+            mask &= speeds <= 9
+        
+        # Filter by custom speed range if specified, otherwise by disc type
+        if custom_speed_range:
+            min_s, max_s = custom_speed_range
+            mask &= (speeds >= min_s) & (speeds <= max_s)
+        elif disc_type:
+            min_s, max_s = DISC_TYPE_SPEED_RANGES.get(disc_type, (1, 14))
+            mask &= (speeds >= min_s) & (speeds <= max_s)
+        
+        for row in np.flatnonzero(mask):
+            name = cols["names"][row]
             if name in added_discs:
                 continue  # Skip discs already added
+            data = cols["data"][row]
             speed = data.get('speed', 0)
             
-            # Filter by skill level
-            if skill_level == "beginner" and speed > 9:
-                continue
-            
-            # Filter by custom speed range if specified
-            if custom_speed_range:
-                min_s, max_s = custom_speed_range
-                if not (min_s <= speed <= max_s):
-                    continue
-            # Otherwise filter by disc type
-            elif disc_type:
-                speed_ranges = {"Putter": (1, 3), "Midrange": (4, 6), "Fairway driver": (7, 9), "Distance driver": (10, 14)}
-                min_s, max_s = speed_ranges.get(disc_type, (1, 14))
-                if not (min_s <= speed <= max_s):
-                    continue
-            
             sample_discs.append(f"  • {name} ({data.get('manufacturer', '?')}): {speed}/{data.get('glide', 4)}/{data.get('turn', 0)}/{data.get('fade', 2)}")
             added_discs.add(name)
             if len(sample_discs) >= 35:
@@ -572,7 +785,10 @@ Hvis du anbefaler discs, brug dette format:
 Afslut med at spørge om brugeren vil vide mere, sammenligne discs, eller se hvordan de flyver (flight chart)."""
 
     try:
-        response = llm.invoke(ai_prompt).content
+        if placeholder is not None:
+            response = stream_llm_invoke(ai_prompt, placeholder)
+        else:
+            response = cached_llm_invoke(ai_prompt)
         
         # POST-PROCESS: Fix any incorrect flight numbers in the response
         response = fix_flight_numbers_in_response(response, DISC_DATABASE)
@@ -588,15 +804,16 @@ Afslut med at spørge om brugeren vil vide mere, sammenligne discs, eller se hvo
         # First try bold text patterns, then fall back to searching full response
         disc_names = []
         response_lower = response.lower()
+        db_names = names_by_length(DISC_DATABASE)
         
         # Find all bold text patterns first
-        bold_matches = re.findall(r'\*\*([^*]+)\*\*', response)
+        bold_matches = BOLD_TEXT_RE.findall(response)
         
         for bold_text in bold_matches:
             bold_lower = bold_text.lower().strip()
             # Check if any disc name matches this bold text
-            for db_name in sorted(DISC_DATABASE.keys(), key=len, reverse=True):
-                if db_name.lower() == bold_lower or db_name.lower() in bold_lower:
+            for db_name, name_lower in db_names:
+                if name_lower in bold_lower:
                     if db_name not in disc_names:
                         disc_names.append(db_name)
                     break
@@ -606,8 +823,8 @@ Afslut med at spørge om brugeren vil vide mere, sammenligne discs, eller se hvo
         # If we didn't find enough, also search for disc names mentioned without bold
         # But only if they appear at start of line (like "Innova P2" or "P2")
         if len(disc_names) < 4:
-            for db_name in sorted(DISC_DATABASE.keys(), key=len, reverse=True):
-                if db_name in disc_names:
+            for db_name, name_lower in db_names:
+                if db_name in disc_names or name_lower not in response_lower:
                     continue
                 # Check for disc name at start of line or after manufacturer name
                 pattern = r'(?:^|\n)(?:[A-Za-z]+\s+)?(' + re.escape(db_name) + r')\b'
@@ -643,7 +860,7 @@ def render_flight_chart_comparison(disc_names, arm_speed='normal', throw_hand='r
     throw_type: 'backhand' or 'forehand'
     """
     import pandas as pd
-    
+
     # Determine if we need to mirror the chart
     # Mirror for: left-handed backhand OR right-handed forehand
     mirror_chart = (throw_hand == 'left' and throw_type == 'backhand') or \
@@ -700,28 +917,23 @@ def render_flight_chart_comparison(disc_names, arm_speed='normal', throw_hand='r
         return
     
     # Build chart data directly from database paths
-    all_data = []
-    
-    for disc in discs_with_data:
-        path = disc['path']
-        if not path:
-            continue
-        
-        # Add path points to chart data with point index for ordering
-        # Default: Negate x so turn goes LEFT, fade goes RIGHT (RHBH view)
-        # If mirrored: Don't negate (for LHBH or RHFH)
-        disc_label = f"{disc['name']} ({disc['speed']}/{disc['glide']}/{disc['turn']}/{disc['fade']})"
-        for i, p in enumerate(path):
-            x_value = p['x'] if mirror_chart else -p['x']
-            all_data.append({
-                'Disc': disc_label,
-                'Turn/Fade': x_value,
-                'Distance': round(p['y'] * 0.3048, 1),  # Convert feet to meters
-                'point_order': i  # Order for line connection
-            })
-    
+    # Default: Negate x so turn goes LEFT, fade goes RIGHT (RHBH view)
+    # If mirrored: Don't negate (for LHBH or RHFH)
+    disc_labels = np.array([
+        f"{disc['name']} ({disc['speed']}/{disc['glide']}/{disc['turn']}/{disc['fade']})"
+        for disc in discs_with_data
+    ], dtype=object)
+    x_values, distances, path_index, point_order = transform_chart_paths(
+        [disc['path'] for disc in discs_with_data], mirror_chart
+    )
+
     # Create chart using Altair
-    df = pd.DataFrame(all_data)
+    df = pd.DataFrame({
+        'Disc': disc_labels[path_index],
+        'Turn/Fade': x_values,
+        'Distance': distances,  # Converted from feet to meters
+        'point_order': point_order  # Order for line connection
+    })
     
     try:
         import altair as alt
@@ -765,9 +977,8 @@ def render_flight_chart_comparison(disc_names, arm_speed='normal', throw_hand='r
         
         # Show stock status for each disc
         st.markdown("#### 🛒 Køb hos Disc Tree")
-        for disc in discs_with_data:
-            disc_name = disc['name']
-            stock_info = check_disc_tree_stock(disc_name)
+        stock_by_disc = check_disc_tree_stock_many([disc['name'] for disc in discs_with_data])
+        for disc_name, stock_info in stock_by_disc.items():
             
             if stock_info['status'] == 'in_stock':
                 price = stock_info.get('price', '')
@@ -807,6 +1018,49 @@ def load_disc_database_full():
     except:
         return {}
 
+@st.cache_resource
+def load_disc_columns():
+    """
+    Column arrays of the disc database for vectorized filtering (built once per process).
+    
+    Rows keep the database order. Manufacturers are stored as ids into the
+    sorted list of lowercase manufacturer names, so brand matching only has
+    to look at each manufacturer once. rows_by_type holds the row numbers of
+    each disc type's speed range, so filtering starts from that subset.
+    """
+    db = load_disc_database()
+    manufacturers = sorted({data.get("manufacturer", "").lower() for data in db.values()})
+    mfr_to_id = {mfr: i for i, mfr in enumerate(manufacturers)}
+    speed = np.asarray([data.get("speed", 0) for data in db.values()], dtype=np.float64)
+    return {
+        "names": list(db.keys()),
+        "data": list(db.values()),
+        "rows_by_type": {
+            disc_type: np.flatnonzero((speed >= min_speed) & (speed <= max_speed))
+            for disc_type, (min_speed, max_speed) in DISC_TYPE_SPEED_RANGES.items()
+        },
+        "speed": speed,
+        "turn": np.asarray([data.get("turn", 0) for data in db.values()], dtype=np.float64),
+        "fade": np.asarray([data.get("fade", 0) for data in db.values()], dtype=np.float64),
+        "mfr_id": np.asarray([mfr_to_id[data.get("manufacturer", "").lower()] for data in db.values()], dtype=np.int16),
+        "manufacturers": manufacturers,
+    }
+
+@st.cache_resource
+def load_flight_path_table(arm_speed):
+    """
+    Backhand flight paths for every distinct set of flight numbers in the
+    database at one arm speed (built once per process).
+    
+    Returns (row by (speed, glide, turn, fade), (n, 18, 2) array of points).
+    """
+    numbers = list(dict.fromkeys(
+        (data.get("speed", 5), data.get("glide", 4), data.get("turn", 0), data.get("fade", 2))
+        for data in load_disc_database().values()
+    ))
+    rows = {flight: row for row, flight in enumerate(numbers)}
+    return rows, precompute_flight_paths(numbers, arm_speed)
+
 DISC_DATABASE = load_disc_database()
 DISC_DATABASE_FULL = load_disc_database_full()
 
@@ -863,13 +1117,17 @@ def render_comparison_chart(discs_data, arm_speed='normal'):
     """Render comparison chart for multiple discs."""
     import pandas as pd
     
+    # Flight numbers found in the database are looked up in the precomputed table
+    rows, table = load_flight_path_table(arm_speed)
+    flights = [(d['speed'], d['glide'], d['turn'], d['fade']) for d in discs_data]
+    computed = iter(generate_flight_paths([f for f in flights if f not in rows], arm_speed))
+    paths = [
+        [{'x': x, 'y': y} for x, y in table[rows[f]].tolist()] if f in rows else next(computed)
+        for f in flights
+    ]
     all_data = []
-    for disc in discs_data:
+    for disc, path in zip(discs_data, paths):
         name = disc['name']
-        path = generate_flight_path(
-            disc['speed'], disc['glide'], disc['turn'], disc['fade'], 
-            arm_speed
-        )
         for p in path:
             all_data.append({
                 'Disc': name,
@@ -918,12 +1176,13 @@ def render_recommendation_flight_charts(disc_names, throwing_distance, database)
     all_data = []
     stats_data = []
     
-    for disc in discs_with_data:
-        # Use user_distance_m for precise calculation
-        path = generate_flight_path(
-            disc['speed'], disc['glide'], disc['turn'], disc['fade'], 
-            user_distance_m=throwing_distance
-        )
+    # Use user_distance_m for precise calculation
+    paths = generate_flight_paths(
+        [(d['speed'], d['glide'], d['turn'], d['fade']) for d in discs_with_data],
+        user_distance_m=throwing_distance
+    )
+    
+    for disc, path in zip(discs_with_data, paths):
         stats = get_flight_stats(
             disc['speed'], disc['glide'], disc['turn'], disc['fade'], 
             user_distance_m=throwing_distance
@@ -983,77 +1242,71 @@ def get_disc_recommendations_by_distance(max_dist, disc_type, flight_pref, brand
     recommendations = []
     
     # Map disc type to speed range
-    speed_ranges = {
-        "Putter": (1, 3),
-        "Midrange": (4, 6),
-        "Fairway driver": (7, 9),
-        "Distance driver": (10, 14)
-    }
-    min_speed, max_speed = speed_ranges.get(disc_type, (1, 14))
+    min_speed, max_speed = DISC_TYPE_SPEED_RANGES.get(disc_type, (1, 14))
     
     # Adjust max speed based on throwing distance
     # Rule of thumb: You need ~10m per speed rating to throw a disc properly
     recommended_max_speed = max_dist // 10
     actual_max_speed = min(max_speed, recommended_max_speed)
     
-    for name, data in DISC_DATABASE.items():
-        speed = data.get("speed", 0)
-        turn = data.get("turn", 0)
-        fade = data.get("fade", 0)
-        manufacturer = data.get("manufacturer", "").lower()
-        
-        # Check if speed is in range for disc type
-        if not (min_speed <= speed <= max_speed):
-            continue
-        
-        # Filter by brand if specified
-        if brand and brand.lower() not in manufacturer:
-            continue
-        
-        # Filter by flight preference
-        if flight_pref == "Understabil" and turn >= 0:
-            continue
-        elif flight_pref == "Overstabil" and turn < 0:
-            continue
-        elif flight_pref == "Lige/stabil" and (turn < -2 or fade > 2):
-            continue
-        
-        # Prioritize discs that match throwing distance
-        priority = 0
-        if speed <= recommended_max_speed:
-            priority = 10  # Good match
-        elif speed <= recommended_max_speed + 2:
-            priority = 5   # Acceptable with lightweight
-        else:
-            priority = 1   # Not ideal
-        
-        # Boost understable discs for beginners (under 70m)
-        if max_dist < 70 and turn <= -2:
-            priority += 5
-        
+    cols = load_disc_columns()
+    
+    # Start from the discs whose speed is in range for the disc type
+    rows = cols["rows_by_type"].get(disc_type)
+    if rows is None:
+        rows = np.flatnonzero((cols["speed"] >= min_speed) & (cols["speed"] <= max_speed))
+    speeds, turns, fades = cols["speed"][rows], cols["turn"][rows], cols["fade"][rows]
+    mask = np.ones(len(rows), dtype=bool)
+    
+    # Filter by brand if specified
+    if brand:
+        brand_lower = brand.lower()
+        brand_ok = np.array([brand_lower in mfr for mfr in cols["manufacturers"]], dtype=bool)
+        mask &= brand_ok[cols["mfr_id"][rows]]
+    
+    # Filter by flight preference
+    if flight_pref == "Understabil":
+        mask &= turns < 0
+    elif flight_pref == "Overstabil":
+        mask &= turns >= 0
+    elif flight_pref == "Lige/stabil":
+        mask &= (turns >= -2) & (fades <= 2)
+    
+    rows, speeds, turns = rows[mask], speeds[mask], turns[mask]
+    
+    # Prioritize discs that match throwing distance:
+    # 10 = good match, 5 = acceptable with lightweight, 1 = not ideal
+    priority = np.where(speeds <= recommended_max_speed, 10,
+                        np.where(speeds <= recommended_max_speed + 2, 5, 1))
+    
+    # Boost understable discs for beginners (under 70m)
+    if max_dist < 70:
+        priority = priority + np.where(turns <= -2, 5, 0)
+    
+    # Sort by priority (stable, so ties keep database order) and keep the top 15
+    order = np.argsort(-priority, kind="stable")[:15]
+    for row, prio in zip(rows[order], priority[order]):
         recommendations.append({
-            "name": name,
-            "data": data,
-            "priority": priority
+            "name": cols["names"][row],
+            "data": cols["data"][row],
+            "priority": int(prio)
         })
     
-    # Sort by priority
-    recommendations.sort(key=lambda x: x["priority"], reverse=True)
-    return recommendations[:15]  # Return top 15 matches
+    return recommendations
 
 def format_filtered_discs_for_ai(max_dist, disc_type, flight_pref, brand=None):
     """Format only relevant discs for AI context based on user preferences."""
+    # The filtering only depends on distance in whole 10m steps, so cache per step
+    disc_lines = _format_filtered_disc_lines(max_dist // 10 * 10, disc_type, flight_pref, brand)
+    return f"ANBEFALEDE DISCS TIL DIG (baseret på {max_dist}m kast, {disc_type}, {flight_pref}):" + disc_lines
+
+@st.cache_data(show_spinner=False)
+def _format_filtered_disc_lines(max_dist, disc_type, flight_pref, brand):
     recommendations = get_disc_recommendations_by_distance(max_dist, disc_type, flight_pref, brand)
     
     if not recommendations:
         # Fallback: just get any discs of that type
-        speed_ranges = {
-            "Putter": (1, 3),
-            "Midrange": (4, 6),
-            "Fairway driver": (7, 9),
-            "Distance driver": (10, 14)
-        }
-        min_speed, max_speed = speed_ranges.get(disc_type, (1, 14))
+        min_speed, max_speed = DISC_TYPE_SPEED_RANGES.get(disc_type, (1, 14))
         
         for name, data in islice(DISC_DATABASE.items(), 50):
             speed = data.get("speed", 0)
@@ -1062,14 +1315,14 @@ def format_filtered_discs_for_ai(max_dist, disc_type, flight_pref, brand=None):
             if len(recommendations) >= 15:
                 break
     
-    lines = [f"ANBEFALEDE DISCS TIL DIG (baseret på {max_dist}m kast, {disc_type}, {flight_pref}):"]
+    lines = []
     for rec in recommendations:
         name = rec["name"]
         data = rec["data"]
-        line = f"  • {name} ({data.get('manufacturer', '?')}): Speed {data.get('speed')}, Glide {data.get('glide')}, Turn {data.get('turn')}, Fade {data.get('fade')}"
+        line = f"\n  • {name} ({data.get('manufacturer', '?')}): Speed {data.get('speed')}, Glide {data.get('glide')}, Turn {data.get('turn')}, Fade {data.get('fade')}"
         lines.append(line)
     
-    return "\n".join(lines)
+    return "".join(lines)
 
 # --- PLASTIC KNOWLEDGE BASE ---
 # Source: https://flightcharts.dgputtheads.com/discgolfplastics.html
@@ -1121,165 +1374,531 @@ PLASTIK GUIDE (fra holdbar/overstabil til blød/understabil):
 - Greb i regn: ESP, Neutron, Star
 """
 
-# --- API KEY HANDLING ---
-if "OPENAI_API_KEY" in st.secrets:
-    api_key = st.secrets["OPENAI_API_KEY"]
-else:
-    st.error("Mangler OPENAI_API_KEY. Tilføj den til Streamlit Secrets.")
-    st.stop()
+# --- PROMPT TEMPLATES ---
+# Static prompt text is built once; each turn only fills in the placeholders
+RECOMMENDATION_PROMPT_TEMPLATE = """Brugerprofil: kaster {max_dist}m, ønsker {flight} flyvning.
+{ai_warning}
+{brand_instruction}
 
-# --- AI SETUP ---
-llm = ChatOpenAI(
-    model="gpt-4o-mini",
-    api_key=api_key,
-    temperature=0.7
-)
-search = DuckDuckGoSearchRun()
+Disc-type: **{disc_type}** ({speed_hint})
+Ekstra ønsker: {extra_info}
 
-# --- KNOWLEDGE BASE SETUP ---
-kb = None
-try:
-    if os.path.exists('./faiss_db/index.faiss'):
-        kb = DiscGolfKnowledgeBase(openai_api_key=api_key)
-        kb_enabled = True
-    else:
-        kb_enabled = False
-except Exception as e:
-    kb_enabled = False
-    print(f"Knowledge base not available: {e}")
+{filtered_discs}
 
-# --- INITIALIZE FEEDBACK SYSTEM ---
-feedback_system = FeedbackSystem()
+HASTIGHEDS-GUIDE (vigtig!):
+- Speed 10+ kræver 80+ meter kastelængde
+- Speed 7-9 kræver 60-80 meter kastelængde  
+- Speed 4-6 kræver 40-60 meter kastelængde
+- Speed 1-3: kan kastes af alle
 
-# --- INITIALIZE SESSION STATE ---
-if "messages" not in st.session_state:
-    st.session_state.messages = []
-if "step" not in st.session_state:
-    st.session_state.step = "start"
-if "user_prefs" not in st.session_state:
-    st.session_state.user_prefs = {}
-if "shown_discs" not in st.session_state:
-    st.session_state.shown_discs = []  # Remember discs shown in flight charts
-if "arm_speed" not in st.session_state:
-    st.session_state.arm_speed = 'normal'  # Begynder/Øvet/Pro → slow/normal/fast
-if "show_chart" not in st.session_state:
-    st.session_state.show_chart = False  # Whether to display flight chart
-if "throw_hand" not in st.session_state:
-    st.session_state.throw_hand = 'right'  # right or left
-if "throw_type" not in st.session_state:
-    st.session_state.throw_type = 'backhand'  # backhand or forehand
-if "feedback_mode" not in st.session_state:
-    st.session_state.feedback_mode = {}  # Track which messages are awaiting feedback
+UNDERSTABIL vs OVERSTABIL:
+- Negative turn (f.eks. -3) = understabil = drejer HØJRE for RH-backhand = lettere at kaste langt
+- Positiv fade (f.eks. +3) = fader VENSTRE til slut
+- Begyndere og kastere under 70m bør vælge understabile discs (turn -2 eller lavere)
 
-# --- HEADER ---
-st.header("FindMinDisc 🥏")
+Søgeresultater:
+{search_results}
 
-# --- HELPER FUNCTIONS ---
-def add_bot_message(content):
-    st.session_state.messages.append({"role": "assistant", "content": content})
+⚠️ VIGTIGT: Anbefal KUN discs fra "ANBEFALEDE DISCS TIL DIG" listen ovenfor!
+Du må IKKE anbefale discs der ikke står på listen. Hvis listen er tom, sig det til brugeren.
 
-def add_user_message(content):
-    st.session_state.messages.append({"role": "user", "content": content})
+Giv 3 FORSKELLIGE {disc_type_lower}-anbefalinger på dansk fra listen ovenfor.
+Vær kreativ - anbefal ikke altid de samme discs!
 
-def reset_conversation():
-    st.session_state.messages = []
-    st.session_state.step = "start"
-    st.session_state.user_prefs = {}
-    st.session_state.shown_discs = []
-    st.session_state.arm_speed = 'normal'  # Default: Øvet
-    st.session_state.show_chart = False
+REGLER:
+- ⚠️ ABSOLUT KRAV: Vælg KUN discs fra "ANBEFALEDE DISCS TIL DIG" listen ovenfor
+- Anbefal KUN {disc_type}s med korrekt speed range ({speed_hint})
+- Følg brugerens mærke-præference hvis angivet
+- For kastere under 70m: anbefal letvægt (150-165g) og understabile discs
+- Nævn vægt i gram
+- Hvis valget er dårligt, sig det tydeligt
+- VARIER dine anbefalinger - der findes mange gode discs!
+- Anbefal IKKE plastik - brugeren kan spørge om hjælp til det bagefter
+- ⚠️ KRITISK: Brug de NØJAGTIGE flight numbers fra databasen ovenfor. Opfind IKKE flight numbers!
+- Hvis du ikke kan finde 3 passende discs på listen, sig det og forklar hvorfor
 
-# --- START CONVERSATION ---
-if st.session_state.step == "start":
-    add_bot_message("""Hej! Jeg hjælper dig med at finde den perfekte disc 🥏
+FORMAT FOR HVER DISC:
 
-**Spørg mig om hvad som helst**, f.eks.:
-- *"Jeg er nybegynder og skal bruge 3 discs"*
-- *"Hvilken putter er god til putting i vind?"*
-- *"Sammenlign Destroyer og Wraith"*
+### 1. **[DiscNavn]** af [Mærke]
+- Flight: X/X/X/X, Vægt: XXXg (brug PRÆCIS de flight numbers der står i databasen!)
+- ✅ Fordele: ...
+- ❌ Ulemper: ...
 
-**Eller vælg en disc-type:**
-1️⃣ Putter | 2️⃣ Midrange | 3️⃣ Fairway | 4️⃣ Distance""")
-    st.session_state.step = "chat"
+Afslut med en kort sammenligning og tilbyd hjælp til valg af plastik."""
 
-# --- DISPLAY MESSAGES ---
-for idx, msg in enumerate(st.session_state.messages):
-    with st.chat_message(msg["role"]):
-        st.write(msg["content"])
-        
-        # Add feedback UI for assistant messages (but not the welcome message)
-        if msg["role"] == "assistant" and idx > 0:
-            # Create a unique key for this message
-            msg_key = f"msg_{idx}"
-            
-            # Check if feedback was already given
-            feedback_given = msg.get("feedback_given", False)
-            
-            if not feedback_given:
-                # Create columns for feedback buttons
-                col1, col2, col3, col4 = st.columns([1, 1, 1, 6])
-                
-                with col1:
-                    if st.button("👍", key=f"thumbs_up_{msg_key}", help="God hjælp"):
-                        # Store positive feedback
-                        question = st.session_state.messages[idx-1]["content"] if idx > 0 else ""
-                        feedback_system.add_feedback(
-                            question=question,
-                            response=msg["content"],
-                            rating=5,
-                            user_prefs=st.session_state.user_prefs,
-                            disc_names=st.session_state.shown_discs
-                        )
-                        # Mark feedback as given and store rating
-                        st.session_state.messages[idx]["feedback_given"] = True
-                        st.session_state.messages[idx]["rating"] = 5
-                        st.success("Tak for din feedback! 👍")
-                        st.rerun()
-                
-                with col2:
-                    if st.button("👎", key=f"thumbs_down_{msg_key}", help="Ikke brugbar"):
-                        # Store negative feedback
-                        question = st.session_state.messages[idx-1]["content"] if idx > 0 else ""
-                        feedback_system.add_feedback(
-                            question=question,
-                            response=msg["content"],
-                            rating=1,
-                            user_prefs=st.session_state.user_prefs,
-                            disc_names=st.session_state.shown_discs
-                        )
-                        # Mark feedback as given, store rating, and enable text feedback
-                        st.session_state.messages[idx]["feedback_given"] = True
-                        st.session_state.messages[idx]["rating"] = 1
-                        st.session_state.messages[idx]["show_text_feedback"] = True
-                        st.rerun()
-                
-                with col3:
-                    if st.button("💬", key=f"feedback_{msg_key}", help="Giv detaljeret feedback"):
-                        st.session_state.messages[idx]["show_text_feedback"] = True
-                        st.rerun()
-            
-            # Show text feedback input if requested
-            if msg.get("show_text_feedback", False) and not msg.get("text_feedback_given", False):
-                text_feedback = st.text_area(
-                    "Din feedback (valgfri):",
-                    key=f"text_feedback_{msg_key}",
-                    placeholder="Hvordan kunne svaret være bedre?"
-                )
-                
-                if st.button("Send feedback", key=f"submit_feedback_{msg_key}"):
-                    if text_feedback.strip():
-                        # Store text feedback
-                        question = st.session_state.messages[idx-1]["content"] if idx > 0 else ""
-                        feedback_system.add_feedback(
-                            question=question,
-                            response=msg["content"],
-                            rating=msg.get("rating", None),  # Use None if no rating given
-                            text_feedback=text_feedback,
-                            user_prefs=st.session_state.user_prefs,
-                            disc_names=st.session_state.shown_discs
-                        )
-                        st.session_state.messages[idx]["text_feedback_given"] = True
-                        st.session_state.messages[idx]["show_text_feedback"] = False
+PLASTIC_PROMPT_TEMPLATE = """Brugerens spørgsmål: "{prompt}"
+
+{disc_context}
+
+PLASTIK GUIDE:
+""" + PLASTIC_GUIDE + """
+
+Svar på dansk. Giv konkrete plastik-anbefalinger baseret på de discs brugeren har fået anbefalet.
+Hvis de spurgte om specifikke discs, anbefal plastik til dem.
+Vær kort og præcis - brugeren har allerede fået disc-anbefalinger."""
+
+GENERAL_PROMPT_TEMPLATE = """Du er en venlig disc golf ekspert.
+
+Tidligere samtale:
+{conversation_context}
+
+Discs vi har talt om: {prev_discs}
+
+Brugerens spørgsmål: "{prompt}"
+
+Søgeresultater:
+{search_results}
+
+REGLER:
+- Svar på dansk, venligt og informativt
+- DETTE ER ET GENERELT SPØRGSMÅL - giv IKKE nye disc-anbefalinger medmindre brugeren specifikt beder om det
+- Svar på spørgsmålet direkte baseret på din viden og søgeresultaterne
+- Hvis spørgsmålet handler om de discs vi talte om, referer til dem
+- Hold svaret kort og relevant"""
+
+# Static instructions go first so follow-up prompts share a byte-identical
+# prefix across turns, which lets the API reuse its cached prefill
+FOLLOW_UP_STATIC_PROMPT = """HASTIGHEDS-GUIDE:
+- Speed 10+ kræver 80+ meter kastelængde
+- Speed 7-9 kræver 60-80 meter kastelængde  
+- Speed 4-6 kræver 40-60 meter kastelængde
+- Speed 1-3: kan kastes af alle
+
+REGLER:
+- VIGTIGST: Vurder først om brugeren beder om nye disc-anbefalinger eller bare stiller et generelt spørgsmål
+- For GENERELLE spørgsmål (fx "hvilken disc er bedst?", "hvem vandt VM?", "hvordan kaster man?"): Svar informativt UDEN at give nye disc-anbefalinger. Brug din viden og søgeresultaterne.
+- For ANBEFALINGS-spørgsmål (fx "anbefal en putter", "jeg vil have en ny disc"): Giv 2-4 konkrete disc-forslag fra databasen
+- Hvis brugeren ændrer distance eller disc-type, giv NYE anbefalinger
+- Svar altid på dansk
+- PRIORITER discs fra databasen da de har verificerede flight numbers
+- ⚠️ KRITISK: Brug de NØJAGTIGE flight numbers fra databasen. Opfind IKKE flight numbers!
+- For kastere under 70m: anbefal letvægt (150-165g) og understabile discs
+- Hvis disc-typen ikke passer til distancen, SIG DET og foreslå en bedre type
+
+Hvis du giver nye anbefalinger (KUN hvis brugeren beder om det), brug dette format:
+
+### 1. **[DiscNavn]** af [Mærke]
+- Flight: X/X/X/X, Vægt: XXXg (brug PRÆCIS de flight numbers der står i databasen!)
+- ✅ Fordele: ...
+- ❌ Ulemper: ..."""
+
+# Only included when the user's message mentions plastic (see PLASTIC_KEYWORDS)
+FOLLOW_UP_PLASTIC_SECTION = """
+
+PLASTIK VIDEN (brugeren spørger om plastik, brug denne viden):
+""" + PLASTIC_GUIDE
+
+FOLLOW_UP_PROMPT_TEMPLATE = FOLLOW_UP_STATIC_PROMPT + """{plastic_section}
+
+Tidligere samtale:
+{conversation_context}
+
+Brugerens nuværende profil: kaster {max_dist}m, søger {disc_type}, ønsker {flight} flyvning.
+{warning}
+
+{filtered_discs}
+
+Søgeresultater fra nettet:
+{search_results}
+
+Brugerens nye besked: "{prompt}\""""
+
+# Disc type too fast for the user's distance: (disc type, distance below which
+# to warn, warning shown to the user, instruction for the AI). First match wins.
+MISMATCH_WARNINGS = (
+    ("Distance driver", 60, """⚠️ **Vent lige lidt!**
+
+Du kaster {max_dist}m og leder efter en distance driver. Det er typisk ikke det bedste valg:
+- Distance drivers (speed 10+) kræver **80+ meter armhastighed** for at flyve korrekt
+- Med {max_dist}m vil en distance driver sandsynligvis bare dykke ned eller fade hårdt til venstre
+
+**Jeg anbefaler i stedet:**
+- **Putter** (speed 1-3) til præcision
+- **Midrange** (speed 4-6) til allround brug
+- **Fairway driver** (speed 7-9) til lidt mere distance
+
+Men okay, du bad om distance drivers, så her er nogle **letvægts understabile** modeller der kan virke:
+
+---
+
+""", """KRITISK: Brugeren kaster kun {max_dist}m men vil have distance drivers.
+Anbefal KUN letvægts (150-160g) understabile distance drivers.
+Forklar at de bør overveje midranges eller fairway drivers i stedet."""),
+    ("Fairway driver", 50, """⚠️ **Bemærk:** Med {max_dist}m kastelængde kan en midrange (speed 4-6) måske passe bedre end en fairway driver. Men her er mine anbefalinger:
+
+---
+
+""", "Brugeren kaster {max_dist}m. Anbefal letvægts understabile fairways."),
+)
+
+def get_mismatch_warnings(max_dist, disc_type):
+    """Return (user warning, AI warning) for a disc type that is too fast for max_dist, or empty strings."""
+    for rule_type, below_dist, user_warning, ai_warning in MISMATCH_WARNINGS:
+        if disc_type == rule_type and max_dist < below_dist:
+            return user_warning.format(max_dist=max_dist), ai_warning.format(max_dist=max_dist)
+    return "", ""
+
+# Warning for the AI in follow-up prompts: disc type -> (distance below which
+# to warn, warning)
+FOLLOW_UP_WARNINGS = {
+    "Distance driver": (70, "⚠️ Med {max_dist}m kastelængde anbefales distance drivers IKKE. Foreslå i stedet fairway drivers eller midranges."),
+    "Fairway driver": (50, "⚠️ Med {max_dist}m kan en midrange være bedre."),
+}
+
+# --- API KEY HANDLING ---
+if "OPENAI_API_KEY" in st.secrets:
+    api_key = st.secrets["OPENAI_API_KEY"]
+else:
+    st.error("Mangler OPENAI_API_KEY. Tilføj den til Streamlit Secrets.")
+    st.stop()
+
+# Optional OpenAI-compatible endpoint, e.g. a self-hosted vLLM server that
+# batches concurrent sessions; the OpenAI API is used when not set
+llm_base_url = st.secrets.get("OPENAI_BASE_URL")
+llm_model = st.secrets.get("OPENAI_MODEL", "gpt-4o-mini")
+
+# Fail soft when the backend is overloaded instead of queueing indefinitely
+LLM_TIMEOUT_SECONDS = 30
+LLM_MAX_RETRIES = 2
+
+# --- AI SETUP ---
+# Clients are created once per process and shared by all sessions and reruns
+@st.cache_resource
+def get_llm(api_key, base_url=None, model="gpt-4o-mini"):
+    return ChatOpenAI(
+        model=model,
+        api_key=api_key,
+        base_url=base_url,
+        temperature=0.7,
+        timeout=LLM_TIMEOUT_SECONDS,
+        max_retries=LLM_MAX_RETRIES
+    )
+
+@st.cache_resource
+def get_search():
+    return DuckDuckGoSearchRun()
+
+llm = get_llm(api_key, llm_base_url, llm_model)
+search = get_search()
+
+def normalize_cache_key(text):
+    """
+    SHA-256 of the text, lowercased and with whitespace collapsed so trivially
+    different prompts share a cache entry. Keeps keys small for multi-KB prompts.
+    """
+    return hashlib.sha256(" ".join(text.lower().split()).encode()).hexdigest()
+
+class _NotCached(Exception):
+    """Raised by _llm_invoke_cached for a lookup-only call that missed the cache."""
+
+# Kept in memory for an hour; least recently used entries beyond max_entries
+# are evicted. The model and base URL are part of the key, so answers from a
+# previously configured model are never served.
+@st.cache_data(ttl=3600, max_entries=256, show_spinner=False)
+def _llm_invoke_cached(key, model, base_url, _prompt, _answer=None, _lookup_only=False):
+    # Underscore arguments are not part of the cache key, so the same entry can
+    # be looked up, filled with an answer streamed elsewhere, or computed here.
+    if _lookup_only:
+        raise _NotCached
+    if _answer is not None:
+        return _answer
+    return llm.invoke(_prompt).content
+
+@st.cache_data(ttl=1800, show_spinner=False)
+def _search_cached(key, _query):
+    return search.run(_query)[:4000]
+
+def cached_llm_invoke(prompt):
+    """Ask the LLM, reusing answers to identical prompts."""
+    return _llm_invoke_cached(normalize_cache_key(prompt), llm_model, llm_base_url, prompt)
+
+def stream_llm_invoke(prompt, placeholder):
+    """
+    Like cached_llm_invoke, but shows the answer in `placeholder` while it streams in.
+    
+    Cached answers are returned at once without streaming. Callers should
+    render their post-processed reply into the same placeholder afterwards.
+    """
+    key = normalize_cache_key(prompt)
+    try:
+        return _llm_invoke_cached(key, llm_model, llm_base_url, prompt, _lookup_only=True)
+    except _NotCached:
+        pass
+    
+    # Streamed outside the cached function: Streamlit would otherwise record
+    # the placeholder updates and try to replay them on later cache hits
+    text = ""
+    try:
+        for chunk in llm.stream(prompt):
+            text += chunk.content
+            placeholder.markdown(text)
+    except Exception:
+        # Streaming failed before anything arrived - retry without streaming
+        if text:
+            raise
+        text = llm.invoke(prompt).content
+    return _llm_invoke_cached(key, llm_model, llm_base_url, prompt, _answer=text)
+
+def cached_search(query):
+    """Web search (first 4000 chars), reusing results for identical queries for 30 minutes."""
+    return _search_cached(normalize_cache_key(query), query)
+
+@st.cache_resource
+def get_token_encoder():
+    """tiktoken encoding of the chat model, or None if it can't be loaded (e.g. offline)."""
+    try:
+        import tiktoken
+        return tiktoken.get_encoding("o200k_base")
+    except Exception as e:
+        print(f"Token counting falls back to an estimate: {e}")
+        return None
+
+def count_tokens(text):
+    """Number of tokens in text (about 4 characters per token without tiktoken)."""
+    encoder = get_token_encoder()
+    if encoder is None:
+        return len(text) // 4 + 1
+    return len(encoder.encode(text))
+
+def build_conversation_context(messages, budget=CONTEXT_TOKEN_BUDGET):
+    """
+    The newest messages as "role: content" lines, in chronological order.
+    
+    Whole messages are added from the newest back until the next one would
+    exceed `budget` tokens, so the text of each included message is intact.
+    """
+    lines = []
+    for m in reversed(messages):
+        line = f"{m['role']}: {m['content']}"
+        budget -= count_tokens(line)
+        if budget < 0:
+            break
+        lines.append(line)
+    return "\n".join(reversed(lines))
+
+# --- KNOWLEDGE BASE SETUP ---
+@st.cache_resource
+def get_knowledge_base(api_key):
+    """Load the FAISS knowledge base once per process (None if unavailable)."""
+    try:
+        if os.path.exists('./faiss_db/index.faiss'):
+            return DiscGolfKnowledgeBase(openai_api_key=api_key)
+    except Exception as e:
+        print(f"Knowledge base not available: {e}")
+    return None
+
+kb = get_knowledge_base(api_key)
+kb_enabled = kb is not None
+
+# --- INITIALIZE FEEDBACK SYSTEM ---
+# Shared across reruns so the feedback file is read once and stats stay in memory
+@st.cache_resource
+def get_feedback_system():
+    return FeedbackSystem()
+
+feedback_system = get_feedback_system()
+
+# --- INITIALIZE SESSION STATE ---
+if "messages" not in st.session_state:
+    st.session_state.messages = []
+if "step" not in st.session_state:
+    st.session_state.step = "start"
+if "user_prefs" not in st.session_state:
+    st.session_state.user_prefs = {}
+if "shown_discs" not in st.session_state:
+    st.session_state.shown_discs = ()  # Remember discs shown in flight charts
+if "arm_speed" not in st.session_state:
+    st.session_state.arm_speed = 'normal'  # Begynder/Øvet/Pro → slow/normal/fast
+if "niveau_label" not in st.session_state:
+    st.session_state.niveau_label = NIVEAU_LABELS[st.session_state.arm_speed]
+if "chart_niveau" not in st.session_state:
+    st.session_state.chart_niveau = st.session_state.niveau_label  # Chart's level selector
+if "show_chart" not in st.session_state:
+    st.session_state.show_chart = False  # Whether to display flight chart
+if "throw_hand" not in st.session_state:
+    st.session_state.throw_hand = 'right'  # right or left
+if "throw_type" not in st.session_state:
+    st.session_state.throw_type = 'backhand'  # backhand or forehand
+if "feedback_mode" not in st.session_state:
+    st.session_state.feedback_mode = {}  # Track which messages are awaiting feedback
+if "next_message_id" not in st.session_state:
+    st.session_state.next_message_id = 0  # Stable ids for widget keys, never reused
+
+# --- HEADER ---
+st.header("FindMinDisc 🥏")
+
+# --- HELPER FUNCTIONS ---
+def get_kb_context(prompt):
+    """Relevant Reddit discussions from the knowledge base, formatted for the AI prompt."""
+    try:
+        kb_results = kb.get_context_for_query(prompt, max_results=3)
+        if kb_results and kb_results != "No relevant information found in knowledge base.":
+            return f"\n\nRELEVANTE REDDIT DISKUSSIONER:\n{kb_results}"
+    except Exception as e:
+        print(f"Error accessing knowledge base: {e}")
+    return ""
+
+def add_message(role, content, **extra):
+    """Store a chat message under a stable id, keeping only the newest MAX_STORED_MESSAGES."""
+    msg_id = st.session_state.next_message_id
+    st.session_state.next_message_id += 1
+    st.session_state.messages.append({"id": msg_id, "role": role, "content": content, **extra})
+    del st.session_state.messages[:-MAX_STORED_MESSAGES]
+
+def add_bot_message(content, **extra):
+    add_message("assistant", content, **extra)
+
+def add_user_message(content):
+    add_message("user", content)
+
+def reply_and_advance(reply, next_step=None):
+    """Show a bot reply, store it in the history and optionally move to the next step."""
+    st.markdown(reply)
+    add_bot_message(reply)
+    if next_step:
+        st.session_state.step = next_step
+
+def reset_conversation():
+    st.session_state.messages = []
+    st.session_state.step = "start"
+    st.session_state.user_prefs = {}
+    st.session_state.shown_discs = ()
+    st.session_state.arm_speed = 'normal'  # Default: Øvet
+    st.session_state.niveau_label = NIVEAU_LABELS['normal']
+    st.session_state.pop("chart_niveau", None)  # Re-seeded from niveau_label on the rerun
+    st.session_state.show_chart = False
+
+def set_arm_speed(arm_speed):
+    """Change the flight chart level, keeping its label and the chart's level selector in sync."""
+    st.session_state.arm_speed = arm_speed
+    st.session_state.niveau_label = NIVEAU_LABELS[arm_speed]
+    st.session_state.chart_niveau = st.session_state.niveau_label
+
+def show_recommended_flight_charts():
+    """Show flight charts for the discs already shown/recommended."""
+    reply = "Her er flight charts for de anbefalede discs:"
+    reply_and_advance(reply)
+    st.session_state.show_chart = True
+    
+    # Add follow-up question about plastic
+    disc_names = st.session_state.get('shown_discs', ())
+    if disc_names:
+        disc_list = ', '.join(disc_names)
+        followup = f"\n\n💡 *Vil du vide hvilken plastik der passer bedst til {disc_list}? Eller spørg mig om noget andet!*"
+        reply_and_advance(followup)
+
+def answer_plastic_question(prompt):
+    """Answer a plastic question from the plastic guide, without a new disc search."""
+    with st.spinner("Finder plastik-info..."):
+        # Get previously recommended discs
+        prev_discs = st.session_state.get('recommended_discs', [])
+        disc_context = ""
+        if prev_discs:
+            disc_context = f"De discs vi talte om: {', '.join(prev_discs)}"
+        
+        plastic_prompt = PLASTIC_PROMPT_TEMPLATE.format(prompt=prompt, disc_context=disc_context)
+
+        answer_placeholder = st.empty()
+        try:
+            reply = stream_llm_invoke(plastic_prompt, answer_placeholder)
+        except Exception as e:
+            reply = f"Beklager, noget gik galt: {e}"
+        
+        answer_placeholder.markdown(reply)
+        add_bot_message(reply)
+
+# --- START CONVERSATION ---
+if st.session_state.step == "start":
+    add_bot_message("""Hej! Jeg hjælper dig med at finde den perfekte disc 🥏
+
+**Spørg mig om hvad som helst**, f.eks.:
+- *"Jeg er nybegynder og skal bruge 3 discs"*
+- *"Hvilken putter er god til putting i vind?"*
+- *"Sammenlign Destroyer og Wraith"*
+
+**Eller vælg en disc-type:**
+1️⃣ Putter | 2️⃣ Midrange | 3️⃣ Fairway | 4️⃣ Distance""", welcome=True)
+    st.session_state.step = "chat"
+
+# --- DISPLAY MESSAGES ---
+def render_message(idx, msg):
+    """Render one chat message, with feedback buttons for assistant replies."""
+    with st.chat_message(msg["role"]):
+        st.write(msg["content"])
+        
+        # Add feedback UI for assistant messages (but not the welcome message)
+        if msg["role"] == "assistant" and not msg.get("welcome"):
+            # Key widgets on the message id, which stays fixed when old messages are dropped
+            msg_key = f"msg_{msg.get('id', idx)}"
+            
+            # Check if feedback was already given
+            feedback_given = msg.get("feedback_given", False)
+            
+            if not feedback_given:
+                # Create columns for feedback buttons
+                col1, col2, col3, col4 = st.columns([1, 1, 1, 6])
+                
+                with col1:
+                    if st.button("👍", key=f"thumbs_up_{msg_key}", help="God hjælp"):
+                        # Store positive feedback
+                        question = st.session_state.messages[idx-1]["content"] if idx > 0 else ""
+                        feedback_system.add_feedback(
+                            question=question,
+                            response=msg["content"],
+                            rating=5,
+                            user_prefs=st.session_state.user_prefs,
+                            disc_names=st.session_state.shown_discs
+                        )
+                        # Mark feedback as given and store rating
+                        msg["feedback_given"] = True
+                        msg["rating"] = 5
+                        st.success("Tak for din feedback! 👍")
+                        st.rerun()
+                
+                with col2:
+                    if st.button("👎", key=f"thumbs_down_{msg_key}", help="Ikke brugbar"):
+                        # Store negative feedback
+                        question = st.session_state.messages[idx-1]["content"] if idx > 0 else ""
+                        feedback_system.add_feedback(
+                            question=question,
+                            response=msg["content"],
+                            rating=1,
+                            user_prefs=st.session_state.user_prefs,
+                            disc_names=st.session_state.shown_discs
+                        )
+                        # Mark feedback as given, store rating, and enable text feedback
+                        msg["feedback_given"] = True
+                        msg["rating"] = 1
+                        msg["show_text_feedback"] = True
+                        st.rerun()
+                
+                with col3:
+                    if st.button("💬", key=f"feedback_{msg_key}", help="Giv detaljeret feedback"):
+                        msg["show_text_feedback"] = True
+                        st.rerun()
+            
+            # Show text feedback input if requested
+            if msg.get("show_text_feedback", False) and not msg.get("text_feedback_given", False):
+                text_feedback = st.text_area(
+                    "Din feedback (valgfri):",
+                    key=f"text_feedback_{msg_key}",
+                    placeholder="Hvordan kunne svaret være bedre?"
+                )
+                
+                if st.button("Send feedback", key=f"submit_feedback_{msg_key}"):
+                    if text_feedback.strip():
+                        # Store text feedback
+                        question = st.session_state.messages[idx-1]["content"] if idx > 0 else ""
+                        feedback_system.add_feedback(
+                            question=question,
+                            response=msg["content"],
+                            rating=msg.get("rating", None),  # Use None if no rating given
+                            text_feedback=text_feedback,
+                            user_prefs=st.session_state.user_prefs,
+                            disc_names=st.session_state.shown_discs
+                        )
+                        msg["text_feedback_given"] = True
+                        msg["show_text_feedback"] = False
                         st.success("Tak for din detaljerede feedback! 💬")
                         st.rerun()
             
@@ -1287,52 +1906,14 @@ for idx, msg in enumerate(st.session_state.messages):
             if feedback_given and not msg.get("show_text_feedback", False):
                 st.caption("✅ Feedback modtaget - tak!")
 
+messages = st.session_state.messages
+first_visible = max(0, len(messages) - MAX_VISIBLE_MESSAGES)
+if first_visible and st.toggle(f"Vis {first_visible} ældre beskeder", key="show_older_messages"):
+    for idx in range(first_visible):
+        render_message(idx, messages[idx])
+for idx in range(first_visible, len(messages)):
+    render_message(idx, messages[idx])
 
-# --- DISPLAY PERSISTENT FLIGHT CHART BUTTON ---
-if st.session_state.shown_discs and not st.session_state.show_chart:
-    if st.button("🥏 Vis mig hvordan de flyver!", type="primary", key="persistent_flight_btn"):
-        st.session_state.show_chart = True
-        st.rerun()
-
-# --- DISPLAY PERSISTENT FLIGHT CHART ---
-if st.session_state.show_chart and st.session_state.shown_discs:
-    # Settings selectors in 3 columns
-    col1, col2, col3 = st.columns(3)
-    with col1:
-        niveau_option = st.radio(
-            "Niveau:",
-            ["Begynder", "Øvet", "Pro"],
-            index={"slow": 0, "normal": 1, "fast": 2}.get(st.session_state.arm_speed, 1),
-            horizontal=True,
-            key="chart_niveau"
-        )
-        niveau_map = {"Begynder": "slow", "Øvet": "normal", "Pro": "fast"}
-        st.session_state.arm_speed = niveau_map[niveau_option]
-    with col2:
-        hand_option = st.radio(
-            "Hånd:",
-            ["Højre", "Venstre"],
-            index=0 if st.session_state.throw_hand == 'right' else 1,
-            horizontal=True,
-            key="chart_hand"
-        )
-        st.session_state.throw_hand = 'right' if hand_option == "Højre" else 'left'
-    with col3:
-        throw_option = st.radio(
-            "Kast:",
-            ["Baghånd", "Forhånd"],
-            index=0 if st.session_state.throw_type == 'backhand' else 1,
-            horizontal=True,
-            key="chart_throw"
-        )
-        st.session_state.throw_type = 'backhand' if throw_option == "Baghånd" else 'forehand'
-    
-    render_flight_chart_comparison(
-        st.session_state.shown_discs, 
-        st.session_state.arm_speed,
-        st.session_state.throw_hand,
-        st.session_state.throw_type
-    )
 
 # --- CHAT INPUT ---
 if prompt := st.chat_input("Skriv dit svar..."):
@@ -1348,14 +1929,10 @@ if prompt := st.chat_input("Skriv dit svar..."):
         if chart_request.get('is_speed_change') and st.session_state.shown_discs:
             new_arm_speed = chart_request.get('arm_speed')
             if new_arm_speed:
-                st.session_state.arm_speed = new_arm_speed
-            niveau_labels = {'slow': 'Begynder', 'normal': 'Øvet', 'fast': 'Pro'}
-            niveau_label = niveau_labels.get(st.session_state.arm_speed, 'Øvet')
-            reply = f"Skiftet til **{niveau_label}** niveau:"
-            st.markdown(reply)
-            add_bot_message(reply)
+                set_arm_speed(new_arm_speed)
+            reply = f"Skiftet til **{st.session_state.niveau_label}** niveau:"
+            reply_and_advance(reply)
             st.session_state.show_chart = True
-            st.rerun()
         
         elif chart_request.get('is_chart_request'):
             new_discs = chart_request.get('discs', [])
@@ -1364,78 +1941,54 @@ if prompt := st.chat_input("Skriv dit svar..."):
             
             # Update arm speed if specified
             if new_arm_speed:
-                st.session_state.arm_speed = new_arm_speed
+                set_arm_speed(new_arm_speed)
             
-            arm_speed = st.session_state.arm_speed
-            niveau_labels = {'slow': 'Begynder', 'normal': 'Øvet', 'fast': 'Pro'}
-            niveau_label = niveau_labels.get(arm_speed, 'Øvet')
+            niveau_label = st.session_state.niveau_label
             
+            all_discs = None
             # Handle adding discs
             if is_add and st.session_state.shown_discs and new_discs:
-                all_discs = list(st.session_state.shown_discs)
-                for disc in new_discs:
-                    if disc not in all_discs:
-                        all_discs.append(disc)
+                all_discs = tuple(dict.fromkeys(st.session_state.shown_discs + tuple(new_discs)))
                 reply = f"Tilføjet **{', '.join(new_discs)}** ({niveau_label} niveau):"
             # Handle new chart request
             elif new_discs:
-                all_discs = new_discs
+                all_discs = tuple(new_discs)
                 reply = f"Flight charts for **{', '.join(all_discs)}** ({niveau_label} niveau):"
             else:
                 # No discs and no previous discs
                 reply = "Nævn mindst én disc - f.eks. 'Sammenlign Destroyer og Mamba'"
-                st.markdown(reply)
-                add_bot_message(reply)
-                st.rerun()
             
-            st.markdown(reply)
-            add_bot_message(reply)
+            reply_and_advance(reply)
             
-            # Update session state - chart will render after rerun
-            st.session_state.step = "done"
-            st.session_state.shown_discs = all_discs
-            st.session_state.show_chart = True
-            
-            follow_up = "*Tilføj flere: 'Også Wraith'* | *Skift niveau: 'Pro' eller 'Begynder'*"
-            add_bot_message(follow_up)
-            st.rerun()
+            if all_discs:
+                # Update session state - chart renders below in this same run
+                st.session_state.step = "done"
+                st.session_state.shown_discs = all_discs
+                st.session_state.show_chart = True
+                
+                follow_up = "*Tilføj flere: 'Også Wraith'* | *Skift niveau: 'Pro' eller 'Begynder'*"
+                reply_and_advance(follow_up)
         
         # --- STEP: CHAT (handles both structured and free-form) ---
         elif st.session_state.step == "chat":
-            prompt_lower = prompt.lower()
+            local_intent = classify_local_intent(prompt, bool(st.session_state.get('shown_discs')))
             
-            # Check for structured disc type selection (1, 2, 3, 4)
-            if prompt.strip() in ["1", "2", "3", "4"]:
-                disc_types = {"1": "Putter", "2": "Midrange", "3": "Fairway driver", "4": "Distance driver"}
-                st.session_state.user_prefs["disc_type"] = disc_types[prompt.strip()]
-                reply = f"Fedt, du leder efter en **{st.session_state.user_prefs['disc_type']}**!\n\nHvor langt kaster du cirka? (i meter)"
-                st.write(reply)
-                add_bot_message(reply)
-                st.session_state.step = "ask_distance"
-            elif "putter" in prompt_lower and len(prompt) < 15:
-                st.session_state.user_prefs["disc_type"] = "Putter"
-                reply = "Fedt, du leder efter en **Putter**!\n\nHvor langt kaster du cirka? (i meter)"
-                st.write(reply)
-                add_bot_message(reply)
-                st.session_state.step = "ask_distance"
-            elif ("midrange" in prompt_lower or "mid-range" in prompt_lower) and len(prompt) < 20:
-                st.session_state.user_prefs["disc_type"] = "Midrange"
-                reply = "Fedt, du leder efter en **Midrange**!\n\nHvor langt kaster du cirka? (i meter)"
-                st.write(reply)
-                add_bot_message(reply)
-                st.session_state.step = "ask_distance"
-            elif "fairway" in prompt_lower and len(prompt) < 20:
-                st.session_state.user_prefs["disc_type"] = "Fairway driver"
-                reply = "Fedt, du leder efter en **Fairway driver**!\n\nHvor langt kaster du cirka? (i meter)"
-                st.write(reply)
-                add_bot_message(reply)
-                st.session_state.step = "ask_distance"
-            elif "distance" in prompt_lower and "driver" in prompt_lower and len(prompt) < 25:
-                st.session_state.user_prefs["disc_type"] = "Distance driver"
-                reply = "Fedt, du leder efter en **Distance driver**!\n\nHvor langt kaster du cirka? (i meter)"
-                st.write(reply)
-                add_bot_message(reply)
-                st.session_state.step = "ask_distance"
+            # Check for structured disc type selection (1, 2, 3, 4 or a short type name)
+            disc_type = match_disc_type(prompt)
+            if disc_type:
+                st.session_state.user_prefs["disc_type"] = disc_type
+                reply = f"Fedt, du leder efter en **{disc_type}**!\n\nHvor langt kaster du cirka? (i meter)"
+                reply_and_advance(reply, "ask_distance")
+            elif local_intent == "reset":
+                reset_conversation()
+                st.rerun()
+            elif local_intent == "greet":
+                reply = "Hej! 👋 Fortæl mig hvad du leder efter, f.eks. *\"Jeg skal bruge en stabil midrange\"*\n\n**Eller vælg en disc-type:**\n1️⃣ Putter | 2️⃣ Midrange | 3️⃣ Fairway | 4️⃣ Distance"
+                reply_and_advance(reply)
+            elif local_intent == "chart":
+                show_recommended_flight_charts()
+            elif local_intent == "plastic":
+                answer_plastic_question(prompt)
             else:
                 # Free-form question - use AI to answer
                 with st.spinner("Søger efter svar..."):
@@ -1444,34 +1997,20 @@ if prompt := st.chat_input("Skriv dit svar..."):
                     if st.session_state.get('shown_discs'):
                         prefs_with_shown['shown_discs'] = st.session_state.shown_discs
                     
-                    result = handle_free_form_question(prompt, prefs_with_shown)
+                    answer_placeholder = st.empty()
+                    result = handle_free_form_question(prompt, prefs_with_shown, answer_placeholder)
                     
                     response = result['response']
                     disc_names = result.get('disc_names', [])
                     
-                    # Add buy links for recommended discs
-                    for disc in disc_names:
-                        if disc and len(disc) >= 2:
-                            links = get_product_links(disc)
-                            buy_link_parts = []
-                            if 'Disc Tree' in links:
-                                buy_link_parts.append(f"[Disc Tree]({links['Disc Tree']})")
-                            if 'NewDisc' in links:
-                                buy_link_parts.append(f"[NewDisc]({links['NewDisc']})")
-                            
-                            if buy_link_parts:
-                                buy_links = f"\n🛒 **Køb {disc}:** {' | '.join(buy_link_parts)}"
-                                # Try to add after "✅ Hvorfor:" line for this disc
-                                # Match disc name (with or without **) followed by content up to Hvorfor line
-                                pattern = rf'(\*?\*?{re.escape(disc)}\*?\*?.*?✅ Hvorfor:[^\n]*)'
-                                match = re.search(pattern, response, re.DOTALL | re.IGNORECASE)
-                                if match:
-                                    response = response.replace(match.group(1), match.group(1) + buy_links)
-                                else:
-                                    # Fallback: add at the end if pattern not found
-                                    response += f"\n{buy_links}"
+                    # Add buy links after the "✅ Hvorfor:" line for each disc
+                    # (disc name with or without **), or at the end if not found
+                    buy_links = build_buy_links(disc_names, "\n🛒 **Køb {disc}:** {links}")
+                    response, missing = insert_buy_links(response, buy_links, "✅ Hvorfor:", bold_optional=True)
+                    for line in missing:
+                        response += f"\n{line}"
                     
-                    st.markdown(response)
+                    answer_placeholder.markdown(response)
                     add_bot_message(response)
                     
                     # Store recommendations for later flight chart (only shown when user asks)
@@ -1482,15 +2021,15 @@ if prompt := st.chat_input("Skriv dit svar..."):
                         
                         # Prepare chart settings but don't show yet
                         skill = result.get('skill_level', 'intermediate')
-                        st.session_state.arm_speed = 'slow' if skill == 'beginner' else 'normal'
-                        st.session_state.shown_discs = disc_names
+                        set_arm_speed('slow' if skill == 'beginner' else 'normal')
+                        st.session_state.shown_discs = tuple(disc_names)
                         # Button is shown persistently outside this block
                     
                     st.session_state.step = "done"
         
         # --- STEP: ASK DISTANCE ---
         elif st.session_state.step == "ask_distance":
-            numbers = re.findall(r'\d+', prompt)
+            numbers = NUMBER_RE.findall(prompt)
             if numbers:
                 dist = int(numbers[0])
                 if dist > 200:
@@ -1498,35 +2037,31 @@ if prompt := st.chat_input("Skriv dit svar..."):
                 st.session_state.user_prefs["max_dist"] = dist
                 
                 reply = f"Okay, du kaster ca. **{dist}m**.\n\nHvilken flyvning ønsker du?\n\n1️⃣ Lige/stabil\n2️⃣ Understabil (drejer til højre for højrehåndede)\n3️⃣ Overstabil (drejer til venstre for højrehåndede)\n4️⃣ Ved ikke"
-                st.write(reply)
-                add_bot_message(reply)
-                st.session_state.step = "ask_flight"
+                reply_and_advance(reply, "ask_flight")
             else:
                 reply = "Jeg fangede ikke et tal. Hvor mange meter kaster du cirka? (f.eks. '60' eller '80 meter')"
-                st.write(reply)
-                add_bot_message(reply)
+                reply_and_advance(reply)
         
         # --- STEP: ASK FLIGHT ---
         elif st.session_state.step == "ask_flight":
             prompt_lower = prompt.lower()
+            flight = None
             if "1" in prompt or "lige" in prompt_lower or "stabil" in prompt_lower:
-                st.session_state.user_prefs["flight"] = "Lige/stabil"
+                flight = "Lige/stabil"
             elif "2" in prompt or "understabil" in prompt_lower or "højre" in prompt_lower:
-                st.session_state.user_prefs["flight"] = "Understabil"
+                flight = "Understabil"
             elif "3" in prompt or "overstabil" in prompt_lower or "venstre" in prompt_lower:
-                st.session_state.user_prefs["flight"] = "Overstabil"
+                flight = "Overstabil"
             elif "4" in prompt or "ved ikke" in prompt_lower:
-                st.session_state.user_prefs["flight"] = "Ved ikke"
+                flight = "Ved ikke"
+            
+            if flight:
+                st.session_state.user_prefs["flight"] = flight
+                reply = "Godt! Er der andet jeg skal vide? (f.eks. 'god i vind', 'til putting', 'til skov', eller bare skriv 'nej')"
+                st.session_state.step = "ask_extra"
             else:
                 reply = "Skriv 1, 2, 3 eller 4 - eller beskriv flyvningen (f.eks. 'lige' eller 'understabil')"
-                st.write(reply)
-                add_bot_message(reply)
-                st.rerun()
-            
-            reply = "Godt! Er der andet jeg skal vide? (f.eks. 'god i vind', 'til putting', 'til skov', eller bare skriv 'nej')"
-            st.write(reply)
-            add_bot_message(reply)
-            st.session_state.step = "ask_extra"
+            reply_and_advance(reply)
         
         # --- STEP: ASK EXTRA INFO ---
         elif st.session_state.step == "ask_extra":
@@ -1540,35 +2075,12 @@ if prompt := st.chat_input("Skriv dit svar..."):
             extra_info = prefs.get("extra", "")
             
             # Check for mismatch and warn user BEFORE searching
-            mismatch_warning = ""
-            if max_dist < 60 and disc_type == "Distance driver":
-                mismatch_warning = f"""⚠️ **Vent lige lidt!**
-
-Du kaster {max_dist}m og leder efter en distance driver. Det er typisk ikke det bedste valg:
-- Distance drivers (speed 10+) kræver **80+ meter armhastighed** for at flyve korrekt
-- Med {max_dist}m vil en distance driver sandsynligvis bare dykke ned eller fade hårdt til venstre
-
-**Jeg anbefaler i stedet:**
-- **Putter** (speed 1-3) til præcision
-- **Midrange** (speed 4-6) til allround brug
-- **Fairway driver** (speed 7-9) til lidt mere distance
-
-Men okay, du bad om distance drivers, så her er nogle **letvægts understabile** modeller der kan virke:
-
----
-
-"""
-            elif max_dist < 50 and disc_type == "Fairway driver":
-                mismatch_warning = f"""⚠️ **Bemærk:** Med {max_dist}m kastelængde kan en midrange (speed 4-6) måske passe bedre end en fairway driver. Men her er mine anbefalinger:
-
----
-
-"""
+            mismatch_warning, ai_warning = get_mismatch_warnings(max_dist, disc_type)
             
             with st.spinner("Søger efter de bedste discs til dig..."):
                 search_query = f"best {disc_type} disc golf {flight} {extra_info} review recommendation lightweight beginner"
                 try:
-                    search_results = search.run(search_query)[:4000]
+                    search_results = cached_search(search_query)
                 except:
                     search_results = ""
                 
@@ -1581,99 +2093,27 @@ Men okay, du bad om distance drivers, så her er nogle **letvægts understabile*
                 speed_hint = speed_ranges.get(disc_type, "")
                 recommended_max_speed = max(6, min(14, max_dist // 10))
                 
-                # Warning for AI
-                ai_warning = ""
-                if max_dist < 60 and disc_type == "Distance driver":
-                    ai_warning = f"""KRITISK: Brugeren kaster kun {max_dist}m men vil have distance drivers.
-Anbefal KUN letvægts (150-160g) understabile distance drivers.
-Forklar at de bør overveje midranges eller fairway drivers i stedet."""
-                elif max_dist < 50 and disc_type == "Fairway driver":
-                    ai_warning = f"Brugeren kaster {max_dist}m. Anbefal letvægts understabile fairways."
-                
                 # Handle brand preferences
                 brand_instruction = ""
-                brand_filter = None
                 extra_lower = extra_info.lower() if extra_info else ""
-                if "mvp" in extra_lower:
-                    brand_instruction = "VIGTIGT: Brugeren ønsker specifikt MVP discs. Anbefal KUN MVP discs!"
-                    brand_filter = "MVP"
-                elif "axiom" in extra_lower:
-                    brand_instruction = "VIGTIGT: Brugeren ønsker specifikt Axiom discs. Anbefal KUN Axiom discs!"
-                    brand_filter = "Axiom"
-                elif "streamline" in extra_lower:
-                    brand_instruction = "VIGTIGT: Brugeren ønsker specifikt Streamline discs. Anbefal KUN Streamline discs!"
-                    brand_filter = "Streamline"
-                elif "innova" in extra_lower:
-                    brand_instruction = "VIGTIGT: Brugeren ønsker specifikt Innova discs. Anbefal KUN Innova discs!"
-                    brand_filter = "Innova"
-                elif "discraft" in extra_lower:
-                    brand_instruction = "VIGTIGT: Brugeren ønsker specifikt Discraft discs. Anbefal KUN Discraft discs!"
-                    brand_filter = "Discraft"
-                elif "latitude" in extra_lower or "lat64" in extra_lower:
-                    brand_instruction = "VIGTIGT: Brugeren ønsker specifikt Latitude 64 discs. Anbefal KUN Latitude 64 discs!"
-                    brand_filter = "Latitude 64"
-                elif "discmania" in extra_lower:
-                    brand_instruction = "VIGTIGT: Brugeren ønsker specifikt Discmania discs. Anbefal KUN Discmania discs!"
-                    brand_filter = "Discmania"
-                elif "kastaplast" in extra_lower:
-                    brand_instruction = "VIGTIGT: Brugeren ønsker specifikt Kastaplast discs. Anbefal KUN Kastaplast discs!"
-                    brand_filter = "Kastaplast"
+                mentioned = set(BRAND_RE.findall(extra_lower))
+                brand_filter = next((BRAND_MAP[kw] for kw in BRAND_MAP if kw in mentioned), None)
+                if brand_filter:
+                    brand_instruction = f"VIGTIGT: Brugeren ønsker specifikt {brand_filter} discs. Anbefal KUN {brand_filter} discs!"
                 
                 # Get filtered disc recommendations from database
                 filtered_discs = format_filtered_discs_for_ai(max_dist, disc_type, flight, brand_filter)
                 
-                ai_prompt = f"""Brugerprofil: kaster {max_dist}m, ønsker {flight} flyvning.
-{ai_warning}
-{brand_instruction}
-
-Disc-type: **{disc_type}** ({speed_hint})
-Ekstra ønsker: {extra_info if extra_info else "Ingen"}
-
-{filtered_discs}
-
-HASTIGHEDS-GUIDE (vigtig!):
-- Speed 10+ kræver 80+ meter kastelængde
-- Speed 7-9 kræver 60-80 meter kastelængde  
-- Speed 4-6 kræver 40-60 meter kastelængde
-- Speed 1-3: kan kastes af alle
-
-UNDERSTABIL vs OVERSTABIL:
-- Negative turn (f.eks. -3) = understabil = drejer HØJRE for RH-backhand = lettere at kaste langt
-- Positiv fade (f.eks. +3) = fader VENSTRE til slut
-- Begyndere og kastere under 70m bør vælge understabile discs (turn -2 eller lavere)
-
-Søgeresultater:
-{search_results}
-
-⚠️ VIGTIGT: Anbefal KUN discs fra "ANBEFALEDE DISCS TIL DIG" listen ovenfor!
-Du må IKKE anbefale discs der ikke står på listen. Hvis listen er tom, sig det til brugeren.
-
-Giv 3 FORSKELLIGE {disc_type.lower()}-anbefalinger på dansk fra listen ovenfor.
-Vær kreativ - anbefal ikke altid de samme discs!
-
-REGLER:
-- ⚠️ ABSOLUT KRAV: Vælg KUN discs fra "ANBEFALEDE DISCS TIL DIG" listen ovenfor
-- Anbefal KUN {disc_type}s med korrekt speed range ({speed_hint})
-- Følg brugerens mærke-præference hvis angivet
-- For kastere under 70m: anbefal letvægt (150-165g) og understabile discs
-- Nævn vægt i gram
-- Hvis valget er dårligt, sig det tydeligt
-- VARIER dine anbefalinger - der findes mange gode discs!
-- Anbefal IKKE plastik - brugeren kan spørge om hjælp til det bagefter
-- ⚠️ KRITISK: Brug de NØJAGTIGE flight numbers fra databasen ovenfor. Opfind IKKE flight numbers!
-- Hvis du ikke kan finde 3 passende discs på listen, sig det og forklar hvorfor
-
-FORMAT FOR HVER DISC:
-
-### 1. **[DiscNavn]** af [Mærke]
-- Flight: X/X/X/X, Vægt: XXXg (brug PRÆCIS de flight numbers der står i databasen!)
-- ✅ Fordele: ...
-- ❌ Ulemper: ...
-
-Afslut med en kort sammenligning og tilbyd hjælp til valg af plastik."""
+                ai_prompt = RECOMMENDATION_PROMPT_TEMPLATE.format(
+                    max_dist=max_dist, flight=flight, ai_warning=ai_warning,
+                    brand_instruction=brand_instruction, disc_type=disc_type, speed_hint=speed_hint,
+                    extra_info=extra_info or "Ingen", filtered_discs=filtered_discs,
+                    search_results=search_results, disc_type_lower=disc_type.lower()
+                )
 
+                answer_placeholder = st.empty()
                 try:
-                    ai_response = llm.invoke(ai_prompt).content
+                    ai_response = stream_llm_invoke(ai_prompt, answer_placeholder)
                     
                     # POST-PROCESS: Fix any incorrect flight numbers
                     ai_response = fix_flight_numbers_in_response(ai_response, DISC_DATABASE)
@@ -1682,52 +2122,11 @@ Afslut med en kort sammenligning og tilbyd hjælp til valg af plastik."""
                     ai_response = fix_manufacturer_names_in_response(ai_response, DISC_DATABASE)
                     
                     # Find disc names - look for **Name** pattern
-                    bold_matches = re.findall(r'\*\*([A-Za-z0-9\s\-]+)\*\*', ai_response)
-                    disc_names = []
-                    skip_words = {'flight', 'numbers', 'fordele', 'ulemper', 'plastik', 'sammenligning', 
-                                  'disc', 'discs', 'speed', 'glide', 'turn', 'fade', 'premium', 'base', 
-                                  'distance', 'driver', 'putter', 'midrange', 'fairway', 'innova', 
-                                  'discraft', 'discmania', 'latitude', 'mvp', 'axiom', 'kastaplast', 
-                                  'westside', 'dynamic', 'navn', 'mærke', 'af', 'anbefaling', 'vent',
-                                  'bemærk', 'lige', 'lidt', 'prodigy', 'lone', 'star', 'streamline',
-                                  'thought', 'space', 'clash', 'dga', 'viking', 'yikun', 'gateway'}
-                    
-                    for match in bold_matches:
-                        words = match.strip().split()
-                        for word in reversed(words):
-                            word_clean = word.strip()
-                            if word_clean.lower() not in skip_words and len(word_clean) > 2:
-                                if word_clean not in disc_names:
-                                    disc_names.append(word_clean)
-                                break
+                    disc_names = extract_disc_names(ai_response)
                     
-                    disc_names = disc_names[:3]
-                    
-                    # Build buy links for each disc and inject into response
-                    modified_response = ai_response
-                    for disc in disc_names:
-                        if disc and len(disc) >= 2:
-                            # Get product links from stores
-                            links = get_product_links(disc)
-                            
-                            # Build buy links - only include stores that have the disc
-                            buy_link_parts = []
-                            if 'Disc Tree' in links:
-                                buy_link_parts.append(f"[Disc Tree]({links['Disc Tree']})")
-                            if 'NewDisc' in links:
-                                buy_link_parts.append(f"[NewDisc]({links['NewDisc']})")
-                            
-                            if buy_link_parts:
-                                buy_links = f"\n   🛒 **Køb:** {' | '.join(buy_link_parts)}"
-                                
-                                # Find the Ulemper line for this disc and add links after it
-                                pattern = rf'(\*\*{re.escape(disc)}\*\*.*?❌ Ulemper:[^\n]*)'
-                                match = re.search(pattern, modified_response, re.DOTALL | re.IGNORECASE)
-                                if match:
-                                    modified_response = modified_response.replace(
-                                        match.group(1), 
-                                        match.group(1) + buy_links
-                                    )
+                    # Build buy links for each disc and add them after its Ulemper line
+                    buy_links = build_buy_links(disc_names, "\n   🛒 **Køb:** {links}")
+                    modified_response, _ = insert_buy_links(ai_response, buy_links, "❌ Ulemper:")
                     
                     # Add warning to response if mismatch
                     final_reply = f"""{mismatch_warning}{modified_response}
@@ -1749,14 +2148,14 @@ Afslut med en kort sammenligning og tilbyd hjælp til valg af plastik."""
                     else:
                         final_reply = f"⚠️ Fejl: {e}"
                 
-                st.markdown(final_reply)
+                answer_placeholder.markdown(final_reply)
                 add_bot_message(final_reply)
                 
                 # Store chart settings but don't show automatically - wait for user to ask
                 if 'recommended_discs' in st.session_state and st.session_state['recommended_discs']:
                     arm_speed = 'slow' if max_dist < 70 else 'normal'
-                    st.session_state.arm_speed = arm_speed
-                    st.session_state.shown_discs = st.session_state['recommended_discs']
+                    set_arm_speed(arm_speed)
+                    st.session_state.shown_discs = tuple(st.session_state['recommended_discs'])
                     # Button is shown persistently outside this block
                 
                 st.session_state.step = "done"
@@ -1774,99 +2173,49 @@ Afslut med en kort sammenligning og tilbyd hjælp til valg af plastik."""
                     'flight', 'flyver', 'flyvning', 'chart', 'graf', 'kurve', 'bane', 'vis'
                 ]) and st.session_state.get('shown_discs')
                 
-                if wants_flight_chart:
-                    # Show the flight chart
-                    reply = "Her er flight charts for de anbefalede discs:"
-                    st.markdown(reply)
-                    add_bot_message(reply)
-                    st.session_state.show_chart = True
-                    
-                    # Add follow-up question about plastic
-                    disc_names = st.session_state.get('shown_discs', [])
-                    if disc_names:
-                        disc_list = ', '.join(disc_names)
-                        followup = f"\n\n💡 *Vil du vide hvilken plastik der passer bedst til {disc_list}? Eller spørg mig om noget andet!*"
-                        st.markdown(followup)
-                        add_bot_message(followup)
-                    
-                    st.rerun()
-                
                 # Check if this is a plastic question (don't need new recommendations)
                 is_plastic_question = 'plastik' in prompt_lower or 'plastic' in prompt_lower
                 
                 # Check if user wants new recommendations
-                wants_new_recs = any(kw in prompt_lower for kw in [
-                    'anbefal', 'foreslå', 'alternativ', 'andre discs', 'ny disc', 'nye discs',
-                    'jeg vil have', 'jeg skal bruge', 'find mig'
-                ])
+                wants_new_recs = any(kw in prompt_lower for kw in NEW_RECS_KEYWORDS)
                 
                 # Check if user is asking about a specific disc type
                 asking_disc_type = any(kw in prompt_lower for kw in [
                     'putter', 'midrange', 'mid-range', 'fairway', 'distance', 'driver', 'approach'
                 ])
                 
+                # Informational questions skip the disc list and recommendation prompt
+                is_info_question = INFO_QUERY_RE.search(prompt_lower) is not None
+                
+                if wants_flight_chart:
+                    show_recommended_flight_charts()
+                
                 # Simple questions about plastic - answer directly without new search
-                if is_plastic_question and not wants_new_recs:
-                    with st.spinner("Finder plastik-info..."):
-                        # Get previously recommended discs
-                        prev_discs = st.session_state.get('recommended_discs', [])
-                        disc_context = ""
-                        if prev_discs:
-                            disc_context = f"De discs vi talte om: {', '.join(prev_discs)}"
-                        
-                        plastic_prompt = f"""Brugerens spørgsmål: "{prompt}"
-
-{disc_context}
-
-PLASTIK GUIDE:
-{PLASTIC_GUIDE}
-
-Svar på dansk. Giv konkrete plastik-anbefalinger baseret på de discs brugeren har fået anbefalet.
-Hvis de spurgte om specifikke discs, anbefal plastik til dem.
-Vær kort og præcis - brugeren har allerede fået disc-anbefalinger."""
-
-                        try:
-                            reply = llm.invoke(plastic_prompt).content
-                        except Exception as e:
-                            reply = f"Beklager, noget gik galt: {e}"
-                        
-                        st.markdown(reply)
-                        add_bot_message(reply)
+                elif is_plastic_question and not wants_new_recs:
+                    answer_plastic_question(prompt)
                 
                 # General questions - answer without giving new recommendations
-                elif not wants_new_recs and not asking_disc_type:
+                elif not wants_new_recs and (not asking_disc_type or is_info_question):
                     with st.spinner("Tænker..."):
                         # Get conversation context
-                        conversation_context = "\n".join([f"{m['role']}: {m['content'][:200]}" for m in st.session_state.messages[-6:]])
+                        conversation_context = build_conversation_context(st.session_state.messages)
                         prev_discs = st.session_state.get('recommended_discs', [])
                         
                         # Search for relevant info
                         try:
-                            search_results = search.run(f"disc golf {prompt}")[:2000]
+                            search_results = cached_search(f"disc golf {prompt}")[:2000]
                         except:
                             search_results = ""
                         
-                        general_prompt = f"""Du er en venlig disc golf ekspert.
-
-Tidligere samtale:
-{conversation_context}
-
-Discs vi har talt om: {', '.join(prev_discs) if prev_discs else 'Ingen endnu'}
-
-Brugerens spørgsmål: "{prompt}"
-
-Søgeresultater:
-{search_results}
-
-REGLER:
-- Svar på dansk, venligt og informativt
-- DETTE ER ET GENERELT SPØRGSMÅL - giv IKKE nye disc-anbefalinger medmindre brugeren specifikt beder om det
-- Svar på spørgsmålet direkte baseret på din viden og søgeresultaterne
-- Hvis spørgsmålet handler om de discs vi talte om, referer til dem
-- Hold svaret kort og relevant"""
+                        general_prompt = GENERAL_PROMPT_TEMPLATE.format(
+                            conversation_context=conversation_context,
+                            prev_discs=', '.join(prev_discs) if prev_discs else 'Ingen endnu',
+                            prompt=prompt, search_results=search_results
+                        )
 
+                        answer_placeholder = st.empty()
                         try:
-                            reply = llm.invoke(general_prompt).content
+                            reply = stream_llm_invoke(general_prompt, answer_placeholder)
                             # Fix any incorrect flight numbers
                             reply = fix_flight_numbers_in_response(reply, DISC_DATABASE)
                             # Fix any incorrect manufacturer names
@@ -1874,7 +2223,7 @@ REGLER:
                         except Exception as e:
                             reply = f"Beklager, noget gik galt: {e}"
                         
-                        st.markdown(reply)
+                        answer_placeholder.markdown(reply)
                         add_bot_message(reply)
                 
                 else:
@@ -1883,7 +2232,7 @@ REGLER:
                         prefs = st.session_state.user_prefs
                         
                         # Check if user is updating their distance
-                        numbers = re.findall(r'\d+', prompt)
+                        numbers = NUMBER_RE.findall(prompt)
                         if numbers:
                             new_dist = int(numbers[0])
                             if new_dist > 200:
@@ -1904,7 +2253,7 @@ REGLER:
                             prefs["disc_type"] = "Distance driver"
                         
                         # Build context from conversation
-                        conversation_context = "\n".join([f"{m['role']}: {m['content'][:200]}" for m in st.session_state.messages[-6:]])
+                        conversation_context = build_conversation_context(st.session_state.messages)
                         
                         # Search again
                         disc_type = prefs.get("disc_type", "disc")
@@ -1913,7 +2262,7 @@ REGLER:
                         
                         search_query = f"best {disc_type} disc golf {flight} {prompt} review"
                         try:
-                            search_results = search.run(search_query)[:3000]
+                            search_results = cached_search(search_query)[:3000]
                         except:
                             search_results = ""
                         
@@ -1925,58 +2274,23 @@ REGLER:
                         }
                         speed_hint = speed_ranges.get(disc_type, "")
                         
-                        warning = ""
-                        if max_dist < 70 and disc_type == "Distance driver":
-                            warning = f"⚠️ Med {max_dist}m kastelængde anbefales distance drivers IKKE. Foreslå i stedet fairway drivers eller midranges."
-                        elif max_dist < 50 and disc_type == "Fairway driver":
-                            warning = f"⚠️ Med {max_dist}m kan en midrange være bedre."
+                        below_dist, warning = FOLLOW_UP_WARNINGS.get(disc_type, (0, ""))
+                        warning = warning.format(max_dist=max_dist) if max_dist < below_dist else ""
                         
                         # Get filtered discs for follow-up
                         filtered_discs = format_filtered_discs_for_ai(max_dist, disc_type, flight, None)
                         
-                        follow_up_prompt = f"""Tidligere samtale:
-{conversation_context}
-
-Brugerens nuværende profil: kaster {max_dist}m, søger {disc_type}, ønsker {flight} flyvning.
-{warning}
-
-Brugerens nye besked: "{prompt}"
-
-{filtered_discs}
-
-HASTIGHEDS-GUIDE:
-- Speed 10+ kræver 80+ meter kastelængde
-- Speed 7-9 kræver 60-80 meter kastelængde  
-- Speed 4-6 kræver 40-60 meter kastelængde
-- Speed 1-3: kan kastes af alle
-
-PLASTIK VIDEN (brug kun hvis brugeren spørger om plastik):
-{PLASTIC_GUIDE}
-
-REGLER:
-- VIGTIGST: Vurder først om brugeren beder om nye disc-anbefalinger eller bare stiller et generelt spørgsmål
-- For GENERELLE spørgsmål (fx "hvilken disc er bedst?", "hvem vandt VM?", "hvordan kaster man?"): Svar informativt UDEN at give nye disc-anbefalinger. Brug din viden og søgeresultaterne.
-- For ANBEFALINGS-spørgsmål (fx "anbefal en putter", "jeg vil have en ny disc"): Giv 2-4 konkrete disc-forslag fra databasen
-- Hvis brugeren ændrer distance eller disc-type, giv NYE anbefalinger
-- Svar altid på dansk
-- PRIORITER discs fra databasen da de har verificerede flight numbers
-- ⚠️ KRITISK: Brug de NØJAGTIGE flight numbers fra databasen. Opfind IKKE flight numbers!
-- For kastere under 70m: anbefal letvægt (150-165g) og understabile discs
-- Hvis disc-typen ikke passer til distancen, SIG DET og foreslå en bedre type
-- Hvis brugeren spørger om plastik, brug PLASTIK VIDEN ovenfor
-
-Søgeresultater fra nettet:
-{search_results}
-
-Hvis du giver nye anbefalinger (KUN hvis brugeren beder om det), brug dette format:
-
-### 1. **[DiscNavn]** af [Mærke]
-- Flight: X/X/X/X, Vægt: XXXg (brug PRÆCIS de flight numbers der står i databasen!)
-- ✅ Fordele: ...
-- ❌ Ulemper: ..."""
+                        mentions_plastic = any(kw in prompt_lower for kw in PLASTIC_KEYWORDS)
+                        follow_up_prompt = FOLLOW_UP_PROMPT_TEMPLATE.format(
+                            plastic_section=FOLLOW_UP_PLASTIC_SECTION if mentions_plastic else "",
+                            conversation_context=conversation_context, max_dist=max_dist, disc_type=disc_type,
+                            flight=flight, warning=warning, prompt=prompt, filtered_discs=filtered_discs,
+                            search_results=search_results
+                        )
 
+                        answer_placeholder = st.empty()
                         try:
-                            reply = llm.invoke(follow_up_prompt).content
+                            reply = stream_llm_invoke(follow_up_prompt, answer_placeholder)
                             
                             # Fix any incorrect flight numbers
                             reply = fix_flight_numbers_in_response(reply, DISC_DATABASE)
@@ -1985,50 +2299,11 @@ Hvis du giver nye anbefalinger (KUN hvis brugeren beder om det), brug dette form
                             reply = fix_manufacturer_names_in_response(reply, DISC_DATABASE)
                             
                             # Extract disc names for stock links
-                            bold_matches = re.findall(r'\*\*([A-Za-z0-9\s\-]+)\*\*', reply)
-                            disc_names = []
-                            skip_words = {'flight', 'numbers', 'fordele', 'ulemper', 'plastik', 'sammenligning', 
-                                          'disc', 'discs', 'speed', 'glide', 'turn', 'fade', 'premium', 'base', 
-                                          'distance', 'driver', 'putter', 'midrange', 'fairway', 'innova', 
-                                          'discraft', 'discmania', 'latitude', 'mvp', 'axiom', 'kastaplast', 
-                                          'westside', 'dynamic', 'navn', 'mærke', 'af', 'anbefaling', 'køb'}
-                            
-                            for match in bold_matches:
-                                words = match.strip().split()
-                                for word in reversed(words):
-                                    word_clean = word.strip()
-                                    if word_clean.lower() not in skip_words and len(word_clean) > 2:
-                                        if word_clean not in disc_names:
-                                            disc_names.append(word_clean)
-                                        break
-                            
-                            disc_names = disc_names[:3]
+                            disc_names = extract_disc_names(reply)
                             
-                            # Add buy links after plastic lines
-                            modified_reply = reply
-                            for disc in disc_names:
-                                if disc and len(disc) >= 2:
-                                    links = get_product_links(disc)
-                                    
-                                    buy_link_parts = []
-                                    if 'Disc Tree' in links:
-                                        buy_link_parts.append(f"[Disc Tree]({links['Disc Tree']})")
-                                    if 'NewDisc' in links:
-                                        buy_link_parts.append(f"[NewDisc]({links['NewDisc']})")
-                                    
-                                    if buy_link_parts:
-                                        buy_links = f"\n   🛒 **Køb:** {' | '.join(buy_link_parts)}"
-                                        
-                                        # Find the Ulemper line for this disc and add links after it
-                                        pattern = rf'(\*\*{re.escape(disc)}\*\*.*?❌ Ulemper:[^\n]*)'
-                                        match = re.search(pattern, modified_reply, re.DOTALL | re.IGNORECASE)
-                                        if match:
-                                            modified_reply = modified_reply.replace(
-                                                match.group(1), 
-                                                match.group(1) + buy_links
-                                            )
-                            
-                            reply = modified_reply
+                            # Add buy links after each disc's Ulemper line
+                            buy_links = build_buy_links(disc_names, "\n   🛒 **Køb:** {links}")
+                            reply, _ = insert_buy_links(reply, buy_links, "❌ Ulemper:")
                             
                             # Store disc names for flight chart
                             if disc_names:
@@ -2037,18 +2312,66 @@ Hvis du giver nye anbefalinger (KUN hvis brugeren beder om det), brug dette form
                         except Exception as e:
                             reply = f"Beklager, noget gik galt: {e}"
                         
-                        st.markdown(reply)
+                        answer_placeholder.markdown(reply)
                         add_bot_message(reply)
                         
                         # Store chart settings but don't show automatically
                         if 'recommended_discs' in st.session_state and st.session_state['recommended_discs']:
                             arm_speed = 'slow' if max_dist < 70 else 'normal'
-                            st.session_state.arm_speed = arm_speed
-                            st.session_state.shown_discs = st.session_state['recommended_discs']
+                            set_arm_speed(arm_speed)
+                            st.session_state.shown_discs = tuple(st.session_state['recommended_discs'])
                             # Button is shown persistently outside this block
                         
                         st.session_state.user_prefs = prefs  # Save updated prefs
 
+# --- DISPLAY PERSISTENT FLIGHT CHART BUTTON ---
+# Rendered after the chat input so charts requested in this run show up
+# right away instead of needing another rerun
+if st.session_state.shown_discs and not st.session_state.show_chart:
+    flight_btn_slot = st.empty()
+    if flight_btn_slot.button("🥏 Vis mig hvordan de flyver!", type="primary", key="persistent_flight_btn"):
+        st.session_state.show_chart = True
+        flight_btn_slot.empty()
+
+# --- DISPLAY PERSISTENT FLIGHT CHART ---
+if st.session_state.show_chart and st.session_state.shown_discs:
+    # Settings selectors in 3 columns
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        niveau_option = st.radio(
+            "Niveau:",
+            list(NIVEAU_ARM_SPEEDS),
+            horizontal=True,
+            key="chart_niveau"
+        )
+        st.session_state.arm_speed = NIVEAU_ARM_SPEEDS[niveau_option]
+        st.session_state.niveau_label = niveau_option
+    with col2:
+        hand_option = st.radio(
+            "Hånd:",
+            ["Højre", "Venstre"],
+            index=0 if st.session_state.throw_hand == 'right' else 1,
+            horizontal=True,
+            key="chart_hand"
+        )
+        st.session_state.throw_hand = 'right' if hand_option == "Højre" else 'left'
+    with col3:
+        throw_option = st.radio(
+            "Kast:",
+            ["Baghånd", "Forhånd"],
+            index=0 if st.session_state.throw_type == 'backhand' else 1,
+            horizontal=True,
+            key="chart_throw"
+        )
+        st.session_state.throw_type = 'backhand' if throw_option == "Baghånd" else 'forehand'
+    
+    render_flight_chart_comparison(
+        st.session_state.shown_discs, 
+        st.session_state.arm_speed,
+        st.session_state.throw_hand,
+        st.session_state.throw_type
+    )
+
 # --- SIDEBAR INFO ---
 with st.sidebar:
     st.markdown("### Om FindMinDisc")
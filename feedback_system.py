@@ -11,46 +11,141 @@ Features:
 - Retrieve feedback for analysis and training
 """
 
+import heapq
 import json
 import os
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 
+try:
+    import orjson
+except ImportError:  # Optional speedup; fall back to the stdlib encoder
+    orjson = None
+
+
+def _encode_line(entry: Dict) -> bytes:
+    """Encode one feedback entry as a JSON Lines record."""
+    if orjson is not None:
+        return orjson.dumps(entry, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY) + b"\n"
+    return (json.dumps(entry, ensure_ascii=False) + "\n").encode('utf-8')
+
+
+_decode = orjson.loads if orjson is not None else json.loads
+
 
 class FeedbackSystem:
     """
     Manages feedback collection and storage for chatbot responses.
     """
     
-    def __init__(self, feedback_file: str = "chatbot_feedback.json"):
+    def __init__(self, feedback_file: str = "chatbot_feedback.jsonl"):
         """
         Initialize feedback system.
         
+        The file is only read when feedback is first accessed; new feedback
+        is appended to it without loading or rewriting existing entries.
+        
         Args:
-            feedback_file: Path to JSON file for storing feedback
+            feedback_file: Path to JSON Lines file for storing feedback
         """
         self.feedback_file = feedback_file
-        self.feedback_data = self._load_feedback()
+        self._feedback_data = None
+        self._stats = None
+    
+    @property
+    def feedback_data(self) -> Dict:
+        """All feedback as {"feedback": [...]}, loaded from file on first access."""
+        if self._feedback_data is None:
+            self._feedback_data = self._load_feedback()
+        return self._feedback_data
+    
+    @feedback_data.setter
+    def feedback_data(self, value: Dict):
+        self._feedback_data = value
+        self._stats = None
+    
+    def _legacy_feedback_file(self) -> Optional[str]:
+        """The .json file older versions used instead of this .jsonl file, if it exists."""
+        stem, ext = os.path.splitext(self.feedback_file)
+        legacy_file = stem + ".json"
+        if ext == ".jsonl" and os.path.exists(legacy_file):
+            return legacy_file
+        return None
     
     def _load_feedback(self) -> Dict:
-        """Load existing feedback from file."""
-        if os.path.exists(self.feedback_file):
-            try:
-                with open(self.feedback_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except Exception as e:
-                print(f"Error loading feedback: {e}")
+        """Load existing feedback from file (one JSON entry per line), or from the legacy .json file."""
+        source = self.feedback_file
+        if not os.path.exists(source):
+            source = self._legacy_feedback_file()
+            if source is None:
                 return {"feedback": []}
-        return {"feedback": []}
+        try:
+            with open(source, 'rb') as f:
+                text = f.read()
+        except Exception as e:
+            print(f"Error loading feedback: {e}")
+            return {"feedback": []}
+        
+        # Files written by older versions hold a single {"feedback": [...]} document
+        migrate = source != self.feedback_file
+        try:
+            data = _decode(text)
+        except ValueError:
+            data = None
+        if isinstance(data, dict) and "feedback" in data:
+            migrate = True
+        else:
+            entries = []
+            for line in text.splitlines():
+                if line.strip():
+                    try:
+                        entries.append(_decode(line))
+                    except ValueError as e:
+                        print(f"Skipping unreadable feedback line: {e}")
+            data = {"feedback": entries}
+        
+        if migrate:
+            # Rewrite as JSON Lines so appends work; a legacy .json file is kept
+            self._feedback_data = data
+            self._save_feedback()
+        return data
     
     def _save_feedback(self):
-        """Save feedback to file."""
+        """Rewrite the whole feedback file."""
+        try:
+            with open(self.feedback_file, 'wb') as f:
+                f.write(b"".join(_encode_line(entry) for entry in self.feedback_data["feedback"]))
+        except Exception as e:
+            print(f"Error saving feedback: {e}")
+    
+    def _append_feedback(self, entry: Dict):
+        """Append one entry to the feedback file."""
+        if not os.path.exists(self.feedback_file) and self._legacy_feedback_file():
+            self.feedback_data  # Migrates the legacy file before the first append
         try:
-            with open(self.feedback_file, 'w', encoding='utf-8') as f:
-                json.dump(self.feedback_data, f, indent=2, ensure_ascii=False)
+            with open(self.feedback_file, 'ab') as f:
+                f.write(_encode_line(entry))
         except Exception as e:
             print(f"Error saving feedback: {e}")
     
+    def _count_stats(self, entry: Dict):
+        """Add one entry to the running totals behind get_feedback_stats."""
+        stats = self._stats
+        stats["total_count"] += 1
+        if entry.get("text_feedback") and entry["text_feedback"].strip():
+            stats["with_text"] += 1
+        rating = entry.get("rating")
+        if rating is None:
+            return
+        stats["with_rating"] += 1
+        if rating >= 4:
+            stats["positive_count"] += 1
+        if -1 <= rating <= 2:
+            stats["negative_count"] += 1
+        if 1 <= rating <= 5:
+            stats["rating_sum"] += rating
+            stats["rating_count"] += 1
+    
     def add_feedback(
         self,
         question: str,
@@ -90,8 +185,12 @@ class FeedbackSystem:
             "metadata": metadata or {}
         }
         
-        self.feedback_data["feedback"].append(feedback_entry)
-        self._save_feedback()
+        self._append_feedback(feedback_entry)
+        # Keep already loaded data in step; otherwise it is read from file when needed
+        if self._feedback_data is not None:
+            self._feedback_data["feedback"].append(feedback_entry)
+            if self._stats is not None:
+                self._count_stats(feedback_entry)
         
         return feedback_id
     
@@ -149,10 +248,16 @@ class FeedbackSystem:
         Returns:
             Dictionary with statistics
         """
-        all_feedback = self.get_all_feedback()
-        total_count = len(all_feedback)
+        if self._stats is None:
+            self._stats = dict.fromkeys((
+                "total_count", "with_rating", "with_text", "positive_count",
+                "negative_count", "rating_sum", "rating_count"
+            ), 0)
+            for entry in self.get_all_feedback():
+                self._count_stats(entry)
+        stats = self._stats
         
-        if total_count == 0:
+        if stats["total_count"] == 0:
             return {
                 "total_count": 0,
                 "with_rating": 0,
@@ -162,21 +267,15 @@ class FeedbackSystem:
                 "average_rating": None
             }
         
-        with_rating = [f for f in all_feedback if f.get("rating") is not None]
-        with_text = len(self.get_feedback_with_text())
-        positive = len(self.get_positive_feedback())
-        negative = len(self.get_negative_feedback())
-        
-        # Calculate average rating (only for 1-5 scale ratings)
-        ratings = [f["rating"] for f in with_rating if f["rating"] >= 1 and f["rating"] <= 5]
-        avg_rating = sum(ratings) / len(ratings) if ratings else None
+        # Average rating only covers 1-5 scale ratings
+        avg_rating = stats["rating_sum"] / stats["rating_count"] if stats["rating_count"] else None
         
         return {
-            "total_count": total_count,
-            "with_rating": len(with_rating),
-            "with_text": with_text,
-            "positive_count": positive,
-            "negative_count": negative,
+            "total_count": stats["total_count"],
+            "with_rating": stats["with_rating"],
+            "with_text": stats["with_text"],
+            "positive_count": stats["positive_count"],
+            "negative_count": stats["negative_count"],
             "average_rating": round(avg_rating, 2) if avg_rating else None
         }
     
@@ -196,6 +295,11 @@ class FeedbackSystem:
         """
         all_feedback = self.get_all_feedback()
         
+        # Recency cutoffs, computed once for the whole scoring pass
+        now = datetime.now()
+        week_ago = now - timedelta(days=7)
+        month_ago = now - timedelta(days=30)
+        
         # Score each feedback entry
         scored_feedback = []
         for entry in all_feedback:
@@ -217,20 +321,19 @@ class FeedbackSystem:
             # Recency (more recent = higher score)
             try:
                 timestamp = datetime.fromisoformat(entry["timestamp"])
-                days_old = (datetime.now() - timestamp).days
                 # Decay score based on age
-                if days_old < 7:
+                if timestamp > week_ago:
                     score += 2
-                elif days_old < 30:
+                elif timestamp > month_ago:
                     score += 1
             except:
                 pass
             
             scored_feedback.append((score, entry))
         
-        # Sort by score (descending) and return top entries
-        scored_feedback.sort(key=lambda x: x[0], reverse=True)
-        return [entry for score, entry in scored_feedback[:limit]]
+        # Top entries by score (descending); ties keep their stored order
+        top = heapq.nlargest(limit, scored_feedback, key=lambda x: x[0])
+        return [entry for score, entry in top]
     
     def clear_feedback(self):
         """Clear all feedback (use with caution)."""
@@ -12,7 +12,16 @@ Formulas derived from least-squares regression on actual flight path data:
 """
 
 import math
+from functools import lru_cache
 
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional - fall back to plain NumPy
+    njit = None
+
+FEET_TO_METERS = 0.3048
 
 # ============================================================================
 # PRECISE FORMULAS FROM disc_database_full.json REGRESSION ANALYSIS
@@ -53,6 +62,22 @@ FADE_COEFFICIENTS = {
     'fast':   {'base': 0.4528, 'turn_factor': 0.0099}
 }
 
+# All coefficients of one arm speed in a flat tuple, so the hot paths do a
+# single lookup per path instead of one nested dict lookup per coefficient:
+# (distance base, distance per speed, distance per glide, turn multiplier,
+#  fade base, fade turn factor)
+_ARM_COEFS = {
+    arm_speed: (
+        DISTANCE_COEFFICIENTS[arm_speed]['base'],
+        DISTANCE_COEFFICIENTS[arm_speed]['speed'],
+        DISTANCE_COEFFICIENTS[arm_speed]['glide'],
+        TURN_ARM_MULT[arm_speed],
+        FADE_COEFFICIENTS[arm_speed]['base'],
+        FADE_COEFFICIENTS[arm_speed]['turn_factor'],
+    )
+    for arm_speed in DISTANCE_COEFFICIENTS
+}
+
 
 def calculate_distance(speed, glide, arm_speed='normal'):
     """
@@ -62,8 +87,8 @@ def calculate_distance(speed, glide, arm_speed='normal'):
     - R² = 0.99+ (99% of variance explained)
     - Average error: ~1.3m
     """
-    coef = DISTANCE_COEFFICIENTS.get(arm_speed, DISTANCE_COEFFICIENTS['normal'])
-    return coef['base'] + coef['speed'] * speed + coef['glide'] * glide
+    coef = _ARM_COEFS.get(arm_speed) or _ARM_COEFS['normal']
+    return coef[0] + coef[1] * speed + coef[2] * glide
 
 
 def calculate_turn_effect(speed, turn, arm_speed='normal'):
@@ -77,7 +102,7 @@ def calculate_turn_effect(speed, turn, arm_speed='normal'):
     - Speed 12 driver: turn_coef ≈ 0.24
     """
     base_coef = TURN_BASE_COEF + TURN_SPEED_ADJ * speed
-    arm_mult = TURN_ARM_MULT.get(arm_speed, 1.0)
+    arm_mult = (_ARM_COEFS.get(arm_speed) or _ARM_COEFS['normal'])[3]
     return turn * base_coef * arm_mult
 
 
@@ -89,8 +114,8 @@ def calculate_fade_effect(fade, turn, arm_speed='normal'):
     
     Key insight: Turn counteracts some fade - understable discs fade less.
     """
-    coef = FADE_COEFFICIENTS.get(arm_speed, FADE_COEFFICIENTS['normal'])
-    return fade * coef['base'] + turn * coef['turn_factor']
+    coef = _ARM_COEFS.get(arm_speed) or _ARM_COEFS['normal']
+    return fade * coef[4] + turn * coef[5]
 
 
 def interpolate_arm_speed(arm_factor):
@@ -99,28 +124,35 @@ def interpolate_arm_speed(arm_factor):
     
     arm_factor: 0.0 = slow, 0.5 = normal, 1.0 = fast
     """
+    return dict(zip(_INTERPOLATED_KEYS, _interpolate_coefs(arm_factor)))
+
+
+_INTERPOLATED_KEYS = ('dist_base', 'dist_speed', 'dist_glide', 'turn_mult', 'fade_base', 'fade_turn')
+
+# Interpolation segments: (coefficients at the start, change to the end) for
+# slow -> normal and normal -> fast, in _ARM_COEFS order
+_SLOW_TO_NORMAL = (
+    _ARM_COEFS['slow'],
+    tuple(hi - lo for lo, hi in zip(_ARM_COEFS['slow'], _ARM_COEFS['normal'])),
+)
+_NORMAL_TO_FAST = (
+    _ARM_COEFS['normal'],
+    tuple(hi - lo for lo, hi in zip(_ARM_COEFS['normal'], _ARM_COEFS['fast'])),
+)
+
+
+@lru_cache(maxsize=4096)
+def _interpolate_coefs(arm_factor):
+    """interpolate_arm_speed as a tuple in _ARM_COEFS order (cached, no dict per call)."""
     if arm_factor <= 0.5:
         # Interpolate between slow and normal
         t = arm_factor * 2  # 0 to 1
-        return {
-            'dist_base': DISTANCE_COEFFICIENTS['slow']['base'] + t * (DISTANCE_COEFFICIENTS['normal']['base'] - DISTANCE_COEFFICIENTS['slow']['base']),
-            'dist_speed': DISTANCE_COEFFICIENTS['slow']['speed'] + t * (DISTANCE_COEFFICIENTS['normal']['speed'] - DISTANCE_COEFFICIENTS['slow']['speed']),
-            'dist_glide': DISTANCE_COEFFICIENTS['slow']['glide'] + t * (DISTANCE_COEFFICIENTS['normal']['glide'] - DISTANCE_COEFFICIENTS['slow']['glide']),
-            'turn_mult': TURN_ARM_MULT['slow'] + t * (TURN_ARM_MULT['normal'] - TURN_ARM_MULT['slow']),
-            'fade_base': FADE_COEFFICIENTS['slow']['base'] + t * (FADE_COEFFICIENTS['normal']['base'] - FADE_COEFFICIENTS['slow']['base']),
-            'fade_turn': FADE_COEFFICIENTS['slow']['turn_factor'] + t * (FADE_COEFFICIENTS['normal']['turn_factor'] - FADE_COEFFICIENTS['slow']['turn_factor'])
-        }
+        start, change = _SLOW_TO_NORMAL
     else:
         # Interpolate between normal and fast
         t = (arm_factor - 0.5) * 2  # 0 to 1
-        return {
-            'dist_base': DISTANCE_COEFFICIENTS['normal']['base'] + t * (DISTANCE_COEFFICIENTS['fast']['base'] - DISTANCE_COEFFICIENTS['normal']['base']),
-            'dist_speed': DISTANCE_COEFFICIENTS['normal']['speed'] + t * (DISTANCE_COEFFICIENTS['fast']['speed'] - DISTANCE_COEFFICIENTS['normal']['speed']),
-            'dist_glide': DISTANCE_COEFFICIENTS['normal']['glide'] + t * (DISTANCE_COEFFICIENTS['fast']['glide'] - DISTANCE_COEFFICIENTS['normal']['glide']),
-            'turn_mult': TURN_ARM_MULT['normal'] + t * (TURN_ARM_MULT['fast'] - TURN_ARM_MULT['normal']),
-            'fade_base': FADE_COEFFICIENTS['normal']['base'] + t * (FADE_COEFFICIENTS['fast']['base'] - FADE_COEFFICIENTS['normal']['base']),
-            'fade_turn': FADE_COEFFICIENTS['normal']['turn_factor'] + t * (FADE_COEFFICIENTS['fast']['turn_factor'] - FADE_COEFFICIENTS['normal']['turn_factor'])
-        }
+        start, change = _NORMAL_TO_FAST
+    return tuple(lo + t * delta for lo, delta in zip(start, change))
 
 
 def calculate_arm_speed_factor(user_distance_m, speed, glide):
@@ -135,6 +167,25 @@ def calculate_arm_speed_factor(user_distance_m, speed, glide):
     
     Uses precise formulas from disc_database_full.json regression.
     """
+    arm_factor, ratio, expected_normal_m, expected_slow_m, expected_fast_m = _arm_speed_factor(
+        user_distance_m, speed, glide
+    )
+    return {
+        'arm_factor': arm_factor,
+        'ratio': ratio,
+        'expected_dist_m': expected_normal_m,
+        'expected_slow_m': expected_slow_m,
+        'expected_fast_m': expected_fast_m
+    }
+
+
+@lru_cache(maxsize=4096)
+def _arm_speed_factor(user_distance_m, speed, glide):
+    """
+    calculate_arm_speed_factor as a tuple of (arm_factor, ratio, expected
+    normal, slow and fast distance in m). Cached: a user's distance stays
+    the same while many discs share flight numbers.
+    """
     # Calculate expected distances for this specific disc
     expected_slow_ft = calculate_distance(speed, glide, 'slow')
     expected_normal_ft = calculate_distance(speed, glide, 'normal')
@@ -170,13 +221,173 @@ def calculate_arm_speed_factor(user_distance_m, speed, glide):
     # Clamp to reasonable range
     arm_factor = max(0.0, min(1.5, arm_factor))
     
-    return {
-        'arm_factor': arm_factor,
-        'ratio': ratio,
-        'expected_dist_m': expected_normal_m,
-        'expected_slow_m': expected_slow_m,
-        'expected_fast_m': expected_fast_m
-    }
+    return arm_factor, ratio, expected_normal_m, expected_slow_m, expected_fast_m
+
+
+FLIGHT_PATH_POINTS = 18
+
+
+def _path_shapes(n_points):
+    """
+    Per-point curve factors at n_points evenly spaced times t from 0 to 1,
+    as a (3, n_points) array of distance, turn and fade factors.
+    """
+    distance_shape, turn_shape, fade_shape = [], [], []
+    for i in range(n_points):
+        t = i / (n_points - 1)
+        # Y: Distance follows a decay curve (faster early, slower late)
+        distance_shape.append(1 - (1 - t) ** 1.8)
+        # X: Turn phase (high speed, early-mid flight)
+        # Turn peaks around 60-70% of flight, uses sine curve
+        turn_shape.append(math.sin(t * math.pi * 0.75))
+        # X: Fade phase (low speed, late flight)
+        # Fade kicks in after ~40% of flight
+        fade_shape.append(((t - 0.4) / 0.6) ** 1.5 if t > 0.4 else 0.0)
+    return np.array([distance_shape, turn_shape, fade_shape])
+
+
+# The points of every flight path lie at the same times, so the curve
+# factors are computed once and each path only scales them
+PATH_SHAPES = _path_shapes(FLIGHT_PATH_POINTS)
+
+# (turn, fade) factor of each point and the last distance factor as Python
+# floats, for get_flight_stats
+_X_SHAPE_PAIRS = tuple(zip(PATH_SHAPES[1].tolist(), PATH_SHAPES[2].tolist()))
+_FINAL_Y_SHAPE = float(PATH_SHAPES[0, -1])
+
+# Curve factors for generate_flight_paths_batch per output dtype. float32
+# halves the memory of large batches; its points are only accurate to
+# about 1e-4 ft, so a few can differ from generate_flight_path after rounding
+_PATH_SHAPES_BY_DTYPE = {
+    np.dtype(np.float64): PATH_SHAPES,
+    np.dtype(np.float32): PATH_SHAPES.astype(np.float32),
+}
+
+
+def _flight_path_points_numpy(distance, turn_effect, fade_effect, shapes):
+    """
+    Trajectory kernel: unrounded x/y arrays for one disc, one point per
+    column of shapes (see _path_shapes).
+    """
+    ys = distance * shapes[0]
+    xs = turn_effect * shapes[1] + fade_effect * shapes[2]
+    return xs, ys
+
+
+def _flight_path_batch_numpy(effects, shapes):
+    """
+    Trajectory kernel for many discs: effects is an (n, 3) array of
+    distance, turn effect and fade effect per disc.
+    """
+    distance, turn_effect, fade_effect = effects[:, 0:1], effects[:, 1:2], effects[:, 2:3]
+    
+    ys = distance * shapes[0]
+    xs = turn_effect * shapes[1] + fade_effect * shapes[2]
+    return xs, ys
+
+
+if njit is not None:
+    @njit(cache=True)
+    def _flight_path_points(distance, turn_effect, fade_effect, shapes):
+        """Numba-compiled version of _flight_path_points_numpy."""
+        n_points = shapes.shape[1]
+        xs = np.empty(n_points, dtype=shapes.dtype)
+        ys = np.empty(n_points, dtype=shapes.dtype)
+        for i in range(n_points):
+            ys[i] = distance * shapes[0, i]
+            xs[i] = turn_effect * shapes[1, i] + fade_effect * shapes[2, i]
+        return xs, ys
+    
+    @njit(cache=True)
+    def _flight_path_batch(effects, shapes):
+        """
+        Numba-compiled version of _flight_path_batch_numpy.
+        
+        Serial on purpose: the whole disc table takes well under a millisecond,
+        and a parallel kernel first run from Streamlit's script thread can hang
+        the process at exit under numba's TBB threading layer.
+        """
+        n = effects.shape[0]
+        xs = np.empty((n, shapes.shape[1]), dtype=shapes.dtype)
+        ys = np.empty((n, shapes.shape[1]), dtype=shapes.dtype)
+        for row in range(n):
+            row_xs, row_ys = _flight_path_points(effects[row, 0], effects[row, 1], effects[row, 2], shapes)
+            xs[row, :] = row_xs
+            ys[row, :] = row_ys
+        return xs, ys
+    
+    # Compile (or load from numba's cache) the float64 kernels at import
+    # rather than on the first chart a user asks for; the float32 batch
+    # path compiles on first use. fastmath is left off: it may reorder the
+    # arithmetic and change rounded path points.
+    _flight_path_points(0.0, 0.0, 0.0, PATH_SHAPES)
+    _flight_path_batch(np.zeros((1, 3)), PATH_SHAPES)
+else:
+    _flight_path_points = _flight_path_points_numpy
+    _flight_path_batch = _flight_path_batch_numpy
+
+
+def _flight_path_effects(speed, glide, turn, fade, arm_speed, throw, user_distance_m):
+    """Distance (feet), turn effect and fade effect (x-axis direction included) that shape a flight path."""
+    # Determine coefficients based on arm speed
+    if user_distance_m is not None:
+        arm_factor = _arm_speed_factor(user_distance_m, speed, glide)[0]
+        turn_mult, fade_base, fade_turn = _interpolate_coefs(arm_factor)[3:]
+        
+        # Distance is user's actual throwing distance
+        distance = user_distance_m / 0.3048  # Convert to feet
+        
+        # Turn and fade use interpolated coefficients
+        turn_base = TURN_BASE_COEF + TURN_SPEED_ADJ * speed
+        turn_effect = turn * turn_base * turn_mult
+        fade_effect = fade * fade_base + turn * fade_turn
+    else:
+        # Use discrete arm speed categories (same formulas as
+        # calculate_distance, calculate_turn_effect and calculate_fade_effect)
+        dist_base, dist_speed, dist_glide, turn_mult, fade_base, fade_turn = (
+            _ARM_COEFS.get(arm_speed) or _ARM_COEFS['normal']
+        )
+        distance = dist_base + dist_speed * speed + dist_glide * glide
+        turn_effect = turn * (TURN_BASE_COEF + TURN_SPEED_ADJ * speed) * turn_mult
+        fade_effect = fade * fade_base + turn * fade_turn
+    
+    # Forehand adjustment - more fade, and the x-axis is mirrored (folded
+    # into the effects so the trajectory kernels need no forehand branch)
+    if throw == 'forehand':
+        fade_effect *= 1.18
+        turn_effect, fade_effect = -turn_effect, -fade_effect
+    
+    return distance, turn_effect, fade_effect
+
+
+def _round_array(values, ndigits):
+    """
+    round(value, ndigits) for every element of a float array, in a few
+    whole-array operations instead of one Python call per point.
+    
+    np.round scales, rounds and scales back, which lands on the other side
+    of a .5 tie when the scaled value is off by float error. Away from
+    ties that gives the same float as round(); the few points that sit
+    within float error of a tie fall back to round() itself.
+    """
+    scale = 10.0 ** ndigits
+    scaled = values * scale
+    rounded = np.rint(scaled) / scale
+    ties = np.flatnonzero(np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6)
+    if ties.size:
+        flat_rounded, flat_values = rounded.reshape(-1), values.reshape(-1)
+        for i in ties.tolist():
+            flat_rounded[i] = round(float(flat_values[i]), ndigits)
+    return rounded
+
+
+def _rounded_paths(xs, ys):
+    """Rounded (n, 18) x and y arrays as nested lists of Python floats."""
+    return _round_array(xs, 3).tolist(), _round_array(ys, 1).tolist()
+
+
+def _points_to_path(xs, ys):
+    return [{'x': x, 'y': y} for x, y in zip(xs, ys)]
 
 
 def generate_flight_path(speed, glide, turn, fade, arm_speed='normal', throw='backhand', user_distance_m=None):
@@ -197,67 +408,129 @@ def generate_flight_path(speed, glide, turn, fade, arm_speed='normal', throw='ba
     Returns:
         List of {x, y} coordinates (18 points)
     """
-    # Determine coefficients based on arm speed
-    if user_distance_m is not None:
-        factors = calculate_arm_speed_factor(user_distance_m, speed, glide)
-        arm_factor = factors['arm_factor']
-        coefs = interpolate_arm_speed(arm_factor)
-        
-        # Distance is user's actual throwing distance
-        distance = user_distance_m / 0.3048  # Convert to feet
-        
-        # Turn and fade use interpolated coefficients
-        turn_base = TURN_BASE_COEF + TURN_SPEED_ADJ * speed
-        turn_effect = turn * turn_base * coefs['turn_mult']
-        fade_effect = fade * coefs['fade_base'] + turn * coefs['fade_turn']
-    else:
-        # Use discrete arm speed categories
-        distance = calculate_distance(speed, glide, arm_speed)
-        turn_effect = calculate_turn_effect(speed, turn, arm_speed)
-        fade_effect = calculate_fade_effect(fade, turn, arm_speed)
+    xs, ys = _flight_path_cached(speed, glide, turn, fade, arm_speed, throw, user_distance_m)
+    return [{'x': x, 'y': y} for x, y in zip(xs, ys)]
+
+
+def generate_flight_path_arrays(speed, glide, turn, fade, arm_speed='normal', throw='backhand', user_distance_m=None):
+    """
+    Flight path as separate x and y columns, without a dict per point.
     
-    # Forehand adjustment - more fade
-    if throw == 'forehand':
-        fade_effect *= 1.18
+    Args: As for generate_flight_path
     
-    # Generate 18 points along the flight path
-    points = []
-    for i in range(18):
-        t = i / 17  # 0 to 1
-        
-        # Y: Distance follows a decay curve (faster early, slower late)
-        y = distance * (1 - (1 - t) ** 1.8)
-        
-        # X: Turn phase (high speed, early-mid flight)
-        # Turn peaks around 60-70% of flight, uses sine curve
-        turn_x = turn_effect * math.sin(t * math.pi * 0.75)
-        
-        # X: Fade phase (low speed, late flight)
-        # Fade kicks in after ~40% of flight
-        if t > 0.4:
-            fade_t = (t - 0.4) / 0.6
-            fade_x = fade_effect * fade_t ** 1.5
-        else:
-            fade_x = 0
-        
-        x = turn_x + fade_x
-        
-        # Forehand: mirror x-axis
-        if throw == 'forehand':
-            x = -x
-        
-        points.append({'x': round(x, 3), 'y': round(y, 1)})
+    Returns:
+        (xs, ys) tuples of the 18 points of generate_flight_path
+    """
+    return _flight_path_cached(speed, glide, turn, fade, arm_speed, throw, user_distance_m)
+
+
+@lru_cache(maxsize=4096)
+def _flight_path_cached(speed, glide, turn, fade, arm_speed, throw, user_distance_m):
+    """Rounded flight path as (xs, ys) tuples; many discs share flight numbers."""
+    distance, turn_effect, fade_effect = _flight_path_effects(
+        speed, glide, turn, fade, arm_speed, throw, user_distance_m
+    )
+    xs, ys = _flight_path_points(
+        float(distance), float(turn_effect), float(fade_effect), PATH_SHAPES
+    )
+    return tuple(round(x, 3) for x in xs.tolist()), tuple(round(y, 1) for y in ys.tolist())
+
+
+def generate_flight_paths(discs, arm_speed='normal', throw='backhand', user_distance_m=None):
+    """
+    Generate flight paths for several discs in one batch.
+    
+    Args:
+        discs: Sequence of (speed, glide, turn, fade) tuples
+        arm_speed, throw, user_distance_m: As for generate_flight_path
+    
+    Returns:
+        List of paths, one per disc, same as calling generate_flight_path for each
+    """
+    if not discs:
+        return []
+    xs, ys = _rounded_paths(*_flight_path_batch_xy(discs, arm_speed, throw, user_distance_m))
+    return [_points_to_path(row_xs, row_ys) for row_xs, row_ys in zip(xs, ys)]
+
+
+def precompute_flight_paths(discs, arm_speed='normal', throw='backhand'):
+    """
+    Flight paths for a whole table of discs, for serving charts by row lookup.
     
-    return points
+    Args:
+        discs: Sequence of (speed, glide, turn, fade) tuples
+        arm_speed, throw: As for generate_flight_path
+    
+    Returns:
+        (n, 18, 2) array of x/y points, rounded like generate_flight_path
+    """
+    if not discs:
+        return np.empty((0, FLIGHT_PATH_POINTS, 2))
+    xs, ys = _flight_path_batch_xy(discs, arm_speed, throw, None)
+    return np.stack((_round_array(xs, 3), _round_array(ys, 1)), axis=-1)
+
+
+def generate_flight_paths_batch(speeds, glides, turns, fades, arm_speed='normal', throw='backhand', dtype=np.float64):
+    """
+    Unrounded flight paths for columns of flight numbers in one vectorized pass.
+    
+    Args:
+        speeds, glides, turns, fades: 1-D arrays of the same length n
+        arm_speed, throw: As for generate_flight_path
+        dtype: np.float64, or np.float32 for half the memory on large scans
+    
+    Returns:
+        (n, 18, 2) array of x/y points of the given dtype
+    """
+    shapes = _PATH_SHAPES_BY_DTYPE.get(np.dtype(dtype))
+    if shapes is None:
+        raise ValueError(f"dtype must be float32 or float64, not {np.dtype(dtype)}")
+    effects = _flight_path_effects_columns(speeds, glides, turns, fades, arm_speed, throw)
+    xs, ys = _flight_path_batch(effects.astype(shapes.dtype, copy=False), shapes)
+    return np.stack((xs, ys), axis=-1)
+
+
+def _flight_path_effects_columns(speeds, glides, turns, fades, arm_speed, throw):
+    """_flight_path_effects for a discrete arm speed over arrays of flight numbers, as an (n, 3) array."""
+    speeds, glides, turns, fades = (np.asarray(column, dtype=np.float64) for column in (speeds, glides, turns, fades))
+    dist_base, dist_speed, dist_glide, turn_mult, fade_base, fade_turn = (
+        _ARM_COEFS.get(arm_speed) or _ARM_COEFS['normal']
+    )
+    distance = dist_base + dist_speed * speeds + dist_glide * glides
+    turn_effect = turns * (TURN_BASE_COEF + TURN_SPEED_ADJ * speeds) * turn_mult
+    fade_effect = fades * fade_base + turns * fade_turn
+    if throw == 'forehand':
+        fade_effect = fade_effect * 1.18
+        turn_effect, fade_effect = -turn_effect, -fade_effect
+    return np.column_stack((distance, turn_effect, fade_effect))
+
+
+def _flight_path_batch_xy(discs, arm_speed, throw, user_distance_m):
+    """Unrounded (n, 18) x and y arrays for a sequence of (speed, glide, turn, fade) tuples."""
+    if user_distance_m is None:
+        # Discrete arm speeds: effects for all discs as column arrays
+        effects = _flight_path_effects_columns(*np.asarray(discs, dtype=np.float64).T, arm_speed, throw)
+    else:
+        effects = np.array([
+            _flight_path_effects(speed, glide, turn, fade, arm_speed, throw, user_distance_m)
+            for speed, glide, turn, fade in discs
+        ], dtype=np.float64)
+    return _flight_path_batch(effects, PATH_SHAPES)
 
 
 def get_flight_stats(speed, glide, turn, fade, arm_speed='normal', user_distance_m=None):
     """Get key flight statistics."""
-    path = generate_flight_path(speed, glide, turn, fade, arm_speed, user_distance_m=user_distance_m)
+    # Only the x values and the last y of the path are needed, so they are
+    # computed straight from the effects. Rounding is monotonic, so the
+    # rounded minimum equals the minimum of the rounded path points.
+    distance, turn_effect, fade_effect = _flight_path_effects(
+        speed, glide, turn, fade, arm_speed, 'backhand', user_distance_m
+    )
+    xs = [turn_effect * turn_shape + fade_effect * fade_shape for turn_shape, fade_shape in _X_SHAPE_PAIRS]
     
-    max_distance = path[-1]['y']
-    max_turn = min(p['x'] for p in path)
-    final_x = path[-1]['x']
+    max_distance = round(distance * _FINAL_Y_SHAPE, 1)
+    max_turn = round(min(xs), 3)
+    final_x = round(xs[-1], 3)
     fade_amount = final_x - max_turn
     
     result = {
@@ -282,26 +555,92 @@ def estimate_required_arm_speed(speed):
     
     Based on: normal distance = 129.93 + 18.30*speed + 15.07*glide (assuming glide=5)
     """
+    return dict(zip(_ARM_SPEED_ESTIMATE_KEYS, _arm_speed_estimate(speed)))
+
+
+_ARM_SPEED_ESTIMATE_KEYS = ('min_distance_m', 'recommended_distance_m', 'description')
+
+
+# typed: 7 and 7.0 format differently in the description
+@lru_cache(maxsize=256, typed=True)
+def _arm_speed_estimate(speed):
+    """estimate_required_arm_speed values as a tuple; only a handful of speeds exist."""
     # Assuming average glide of 5
     expected_normal = (129.93 + 18.30 * speed + 15.07 * 5) * 0.3048
     expected_slow = (153.61 + 13.85 * speed + 8.07 * 5) * 0.3048
     
-    return {
-        'min_distance_m': round(expected_slow, 0),
-        'recommended_distance_m': round(expected_normal, 0),
-        'description': f"Speed {speed} disc: {expected_slow:.0f}-{expected_normal:.0f}m kastelængde"
-    }
+    return (
+        round(expected_slow, 0),
+        round(expected_normal, 0),
+        f"Speed {speed} disc: {expected_slow:.0f}-{expected_normal:.0f}m kastelængde",
+    )
+
+
+ARM_SPEEDS = ('slow', 'normal', 'fast')
 
 
 def compare_arm_speeds(speed, glide, turn, fade):
     """Compare flight paths at different arm speeds."""
+    # All three arm speeds go through the trajectory kernel as one batch
+    effects = np.array([
+        _flight_path_effects(speed, glide, turn, fade, arm_speed, 'backhand', None)
+        for arm_speed in ARM_SPEEDS
+    ], dtype=np.float64)
+    xs, ys = _rounded_paths(*_flight_path_batch(effects, PATH_SHAPES))
     return {
-        'slow': generate_flight_path(speed, glide, turn, fade, 'slow'),
-        'normal': generate_flight_path(speed, glide, turn, fade, 'normal'),
-        'fast': generate_flight_path(speed, glide, turn, fade, 'fast')
+        arm_speed: _points_to_path(row_xs, row_ys)
+        for arm_speed, row_xs, row_ys in zip(ARM_SPEEDS, xs, ys)
     }
 
 
+def _transform_points_numpy(xs, ys, mirror):
+    """Negate x unless mirrored and convert y from feet to meters."""
+    xs_out = xs if mirror else -xs
+    return xs_out, ys * FEET_TO_METERS
+
+
+if njit is not None:
+    @njit(cache=True)
+    def _transform_points(xs, ys, mirror):
+        """Numba-compiled version of _transform_points_numpy."""
+        n = xs.shape[0]
+        xs_out = np.empty(n)
+        ys_out = np.empty(n)
+        sign = 1.0 if mirror else -1.0
+        for i in range(n):
+            xs_out[i] = sign * xs[i]
+            ys_out[i] = ys[i] * FEET_TO_METERS
+        return xs_out, ys_out
+else:
+    _transform_points = _transform_points_numpy
+
+
+def transform_chart_paths(paths, mirror=False):
+    """
+    Flatten stored flight paths into chart columns in one pass.
+    
+    Default view is RHBH: x is negated so turn goes LEFT and fade goes RIGHT.
+    With mirror=True (LHBH or RHFH) x is kept as-is.
+    
+    Args:
+        paths: List of flight paths, each a list of {x, y} points (y in feet)
+        mirror: Whether to mirror the chart
+    
+    Returns:
+        Tuple of (x, distance_m, path_index, point_order) NumPy arrays
+    """
+    lengths = [len(path) for path in paths]
+    total = sum(lengths)
+    xs = np.fromiter((p['x'] for path in paths for p in path), dtype=np.float64, count=total)
+    ys = np.fromiter((p['y'] for path in paths for p in path), dtype=np.float64, count=total)
+    
+    xs_out, ys_out = _transform_points(xs, ys, mirror)
+    
+    path_index = np.repeat(np.arange(len(paths)), lengths)
+    point_order = np.concatenate([np.arange(n) for n in lengths]) if paths else np.empty(0, dtype=np.int64)
+    return xs_out, _round_array(ys_out, 1), path_index, point_order
+
+
 # Flight number explanations for users
 FLIGHT_NUMBER_GUIDE = """
 **Speed** (1-14): Discens aerodynamik. Højere = bredere kant = kræver mere armhastighed.
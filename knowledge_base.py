@@ -3,9 +3,15 @@ Knowledge Base System with Semantic Search
 Uses embeddings and vector similarity for intelligent content retrieval
 """
 
+import base64
 import json
 import os
 import pickle
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
 from typing import List, Dict, Optional
 import numpy as np
 import faiss
@@ -14,6 +20,63 @@ from langchain_text_splitters import RecursiveCharacterTextSplitter
 from datetime import datetime
 
 
+# Below this many documents a graph index (HNSW) over float16 vectors
+# answers queries; larger corpora use IVF-PQ, which compresses them further
+HNSW_MAX_DOCUMENTS = 10000
+HNSW_NEIGHBORS = 32
+HNSW_EF_SEARCH = 64
+IVFPQ_SUBQUANTIZERS = 32
+IVFPQ_NPROBE = 16
+
+# Query embeddings kept so repeated searches skip the embedding API call.
+# A new query this similar (cosine) to a cached one reuses its neighbours.
+QUERY_CACHE_SIZE = 512
+QUERY_CACHE_SIMILARITY = 0.87
+# New query embeddings between writes of the cache to disk
+QUERY_CACHE_SAVE_EVERY = 32
+
+# How long the first of several concurrent queries waits for others to
+# share its embedding request
+QUERY_BATCH_WINDOW_SECONDS = 0.01
+
+
+class _EmbeddingBatcher:
+    """
+    Coalesces embedding requests from concurrent threads (e.g. several
+    Streamlit sessions sharing one knowledge base) into one API call.
+    
+    The first caller waits QUERY_BATCH_WINDOW_SECONDS, then embeds every
+    text queued meanwhile and hands each caller its row.
+    """
+    
+    def __init__(self, embed_texts):
+        self._embed_texts = embed_texts
+        self._lock = threading.Lock()
+        self._pending = []
+    
+    def embed(self, text: str) -> np.ndarray:
+        """Embedding of one text as a (1, dimension) float32 array."""
+        future = Future()
+        with self._lock:
+            self._pending.append((text, future))
+            leader = len(self._pending) == 1
+        
+        if leader:
+            time.sleep(QUERY_BATCH_WINDOW_SECONDS)
+            with self._lock:
+                batch, self._pending = self._pending, []
+            try:
+                rows = self._embed_texts([queued for queued, _ in batch])
+            except Exception as e:
+                for _, waiting in batch:
+                    waiting.set_exception(e)
+            else:
+                for i, (_, waiting) in enumerate(batch):
+                    waiting.set_result(rows[i:i + 1].copy())
+        
+        return future.result()
+
+
 class DiscGolfKnowledgeBase:
     """
     Knowledge base system for disc golf content with semantic search.
@@ -46,6 +109,17 @@ class DiscGolfKnowledgeBase:
         self.metadatas = []
         self.ids = []
         
+        # Metadata key -> value of every document as an array, for filtering
+        self._metadata_columns = {}
+        
+        # Normalized query text -> unit query embedding (LRU order), and the
+        # nearest documents found for it as (distances, indices) arrays
+        self._query_cache = OrderedDict()
+        self._query_neighbours = {}
+        self._query_cache_unsaved = 0
+        self._query_cache_lock = threading.Lock()
+        self._query_batcher = _EmbeddingBatcher(self._embed_texts)
+        
         # Text splitter for chunking large posts
         self.text_splitter = RecursiveCharacterTextSplitter(
             chunk_size=1000,
@@ -55,6 +129,7 @@ class DiscGolfKnowledgeBase:
         
         # Try to load existing index
         self._load_index()
+        self._load_query_cache()
     
     def _load_index(self):
         """Load existing FAISS index if available."""
@@ -63,12 +138,14 @@ class DiscGolfKnowledgeBase:
         
         if os.path.exists(index_path) and os.path.exists(meta_path):
             try:
-                self.index = faiss.read_index(index_path)
+                # Memory-mapped: the vectors are paged in as searches touch them
+                self.index = faiss.read_index(index_path, faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
                 with open(meta_path, 'rb') as f:
                     data = pickle.load(f)
                     self.documents = data['documents']
                     self.metadatas = data['metadatas']
                     self.ids = data['ids']
+                self._configure_search()
                 print(f"Loaded existing index with {len(self.documents)} documents")
             except Exception as e:
                 print(f"Error loading index: {e}")
@@ -91,6 +168,97 @@ class DiscGolfKnowledgeBase:
             }, f)
         print(f"Saved index with {len(self.documents)} documents")
     
+    def _load_query_cache(self):
+        """Load cached query embeddings saved by earlier sessions."""
+        cache_path = os.path.join(self.db_path, "query_cache.pkl")
+        if not os.path.exists(cache_path):
+            return
+        try:
+            with open(cache_path, 'rb') as f:
+                self._query_cache = OrderedDict(pickle.load(f))
+        except Exception as e:
+            print(f"Error loading query cache: {e}")
+            self._query_cache = OrderedDict()
+    
+    def _save_query_cache(self, entries):
+        """
+        Save cached query embeddings; they do not depend on the index.
+        
+        The cache is written to a temporary file that then replaces the old
+        one, so a failed or concurrent write never leaves a truncated cache.
+        A cache that cannot be written only costs later sessions API calls.
+        """
+        cache_path = os.path.join(self.db_path, "query_cache.pkl")
+        tmp_path = None
+        try:
+            with tempfile.NamedTemporaryFile('wb', dir=self.db_path, suffix='.tmp', delete=False) as f:
+                tmp_path = f.name
+                pickle.dump(entries, f)
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            print(f"Error saving query cache: {e}")
+            if tmp_path and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+    
+    def _embed_texts(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed texts with one API request, as an (n, dimension) float32 array.
+        
+        The embeddings are requested base64-encoded and decoded straight into
+        the array, instead of as JSON lists of Python floats. Texts must fit
+        the model's context: post text is chunked to 1000 characters and
+        Reddit comments are capped at 10000.
+        """
+        response = self.embeddings.client.create(
+            input=texts,
+            model=self.embeddings.model,
+            encoding_format="base64"
+        )
+        data = sorted(response.data, key=lambda item: item.index)
+        return np.vstack([np.frombuffer(base64.b64decode(item.embedding), dtype=np.float32) for item in data])
+    
+    def _embed_query(self, key: str, query: str) -> np.ndarray:
+        """Unit embedding of a query as a (1, dimension) array, from the cache when possible."""
+        with self._query_cache_lock:
+            query_array = self._query_cache.get(key)
+            if query_array is not None:
+                self._query_cache.move_to_end(key)
+                return query_array
+        
+        query_array = self._query_batcher.embed(query)
+        faiss.normalize_L2(query_array)
+        
+        entries = None
+        with self._query_cache_lock:
+            self._query_cache[key] = query_array
+            if len(self._query_cache) > QUERY_CACHE_SIZE:
+                evicted, _ = self._query_cache.popitem(last=False)
+                self._query_neighbours.pop(evicted, None)
+            self._query_cache_unsaved += 1
+            if self._query_cache_unsaved >= QUERY_CACHE_SAVE_EVERY:
+                self._query_cache_unsaved = 0
+                entries = list(self._query_cache.items())
+        if entries is not None:
+            self._save_query_cache(entries)
+        return query_array
+    
+    def _similar_neighbours(self, query_array: np.ndarray, k: int):
+        """Neighbours of a cached query similar enough to stand in for this one, or None."""
+        with self._query_cache_lock:
+            candidates = [
+                (self._query_cache[key], neighbours)
+                for key, neighbours in self._query_neighbours.items()
+                if len(neighbours[1]) >= k and key in self._query_cache
+            ]
+        if not candidates:
+            return None
+        similarities = np.vstack([embedding for embedding, _ in candidates]) @ query_array[0]
+        best = int(np.argmax(similarities))
+        if similarities[best] < QUERY_CACHE_SIMILARITY:
+            return None
+        distances, indices = candidates[best][1]
+        return distances[:k], indices[:k]
+    
     def load_reddit_data(self, json_file: str = 'reddit_discgolf_data.json'):
         """
         Load Reddit data from JSON file and add to knowledge base.
@@ -159,36 +327,100 @@ class DiscGolfKnowledgeBase:
                         metadatas.append(comment_meta)
                         ids.append(f"{post['id']}_comment_{j}")
         
+        # Documents that differ only in case or whitespace (reposts, copied
+        # replies) are embedded once and share the vector
+        unique_docs = []
+        unique_rows = {}
+        doc_rows = []
+        for doc in documents:
+            key = " ".join(doc.lower().split())
+            row = unique_rows.get(key)
+            if row is None:
+                row = unique_rows[key] = len(unique_docs)
+                unique_docs.append(doc)
+            doc_rows.append(row)
+        
         # Generate embeddings in batches
         batch_size = 100
         total_docs = len(documents)
-        all_embeddings = []
+        total_unique = len(unique_docs)
+        embeddings_array = None
         
-        print(f"Generating embeddings for {total_docs} documents...")
-        for i in range(0, total_docs, batch_size):
-            batch_docs = documents[i:i + batch_size]
-            batch_embeddings = self.embeddings.embed_documents(batch_docs)
-            all_embeddings.extend(batch_embeddings)
-            print(f"Processed {min(i + batch_size, total_docs)}/{total_docs} documents")
+        print(f"Generating embeddings for {total_unique} unique of {total_docs} documents...")
+        for i in range(0, total_unique, batch_size):
+            batch_docs = unique_docs[i:i + batch_size]
+            batch_embeddings = self._embed_texts(batch_docs)
+            # Filled in place, so the embeddings are never held twice
+            if embeddings_array is None:
+                embeddings_array = np.empty((total_unique, batch_embeddings.shape[1]), dtype=np.float32)
+            embeddings_array[i:i + len(batch_docs)] = batch_embeddings
+            print(f"Processed {min(i + batch_size, total_unique)}/{total_unique} documents")
         
-        # Convert to numpy array
-        embeddings_array = np.array(all_embeddings, dtype='float32')
+        if total_unique < total_docs:
+            embeddings_array = embeddings_array[doc_rows]
+        
+        # On unit vectors L2 distance ranks like cosine similarity
+        faiss.normalize_L2(embeddings_array)
         
         # Create FAISS index
-        dimension = embeddings_array.shape[1]
-        self.index = faiss.IndexFlatL2(dimension)  # L2 distance
-        self.index.add(embeddings_array)
+        self.index = self._build_index(embeddings_array)
+        self._configure_search()
+        self._query_neighbours = {}
         
         # Store documents and metadata
         self.documents = documents
         self.metadatas = metadatas
         self.ids = ids
+        self._metadata_columns = {}
         
         # Save to disk
         self._save_index()
         
         print(f"✅ Successfully loaded {total_docs} documents into knowledge base")
     
+    def _build_index(self, embeddings_array: np.ndarray):
+        """
+        Create an approximate nearest neighbour index holding the embeddings.
+        
+        Args:
+            embeddings_array: (n, dimension) float32 array of unit vectors
+            
+        Returns:
+            FAISS index with all embeddings added
+        """
+        count, dimension = embeddings_array.shape
+        if count <= HNSW_MAX_DOCUMENTS:
+            # float16 halves the stored vectors at no visible cost in ranking
+            index = faiss.IndexHNSWSQ(dimension, faiss.ScalarQuantizer.QT_fp16, HNSW_NEIGHBORS)
+            index.train(embeddings_array)
+        else:
+            nlist = int(4 * np.sqrt(count))
+            quantizer = faiss.IndexFlatL2(dimension)
+            index = faiss.IndexIVFPQ(quantizer, dimension, nlist, IVFPQ_SUBQUANTIZERS, 8)
+            index.train(embeddings_array)
+        index.add(embeddings_array)
+        return index
+    
+    def _configure_search(self):
+        """Set the query-time search breadth, which is not saved with the index."""
+        if isinstance(self.index, faiss.IndexHNSW):
+            self.index.hnsw.efSearch = HNSW_EF_SEARCH
+        elif isinstance(self.index, faiss.IndexIVF):
+            self.index.nprobe = IVFPQ_NPROBE
+            # search() sends one query at a time, which the default mode (split
+            # over queries) runs on a single thread; split the probed lists
+            # across threads instead
+            self.index.parallel_mode = 1
+    
+    def _metadata_column(self, key: str) -> np.ndarray:
+        """Object array of one metadata field (None where missing) over all documents."""
+        column = self._metadata_columns.get(key)
+        if column is None:
+            column = np.empty(len(self.metadatas), dtype=object)
+            column[:] = [meta.get(key) for meta in self.metadatas]
+            self._metadata_columns[key] = column
+        return column
+    
     def search(self, query: str, n_results: int = 5, 
                filter_dict: Optional[Dict] = None) -> List[Dict]:
         """
@@ -206,36 +438,40 @@ class DiscGolfKnowledgeBase:
             return []
         
         # Generate query embedding
-        query_embedding = self.embeddings.embed_query(query)
-        query_array = np.array([query_embedding], dtype='float32')
+        key = " ".join(query.lower().split())
+        query_array = self._embed_query(key, query)
+        k = min(n_results * 2, len(self.documents))
+        
+        # Search in FAISS, unless this or a very similar query was searched
+        # at least as wide before
+        neighbours = self._query_neighbours.get(key)
+        if neighbours is not None and len(neighbours[1]) >= k:
+            distances, indices = neighbours[0][:k], neighbours[1][:k]
+        else:
+            neighbours = self._similar_neighbours(query_array, k)
+            if neighbours is None:
+                distances, indices = self.index.search(query_array, k)
+                distances, indices = distances[0], indices[0]
+                with self._query_cache_lock:
+                    self._query_neighbours[key] = (distances, indices)
+            else:
+                distances, indices = neighbours
         
-        # Search in FAISS
-        distances, indices = self.index.search(query_array, min(n_results * 2, len(self.documents)))
+        # Drop invalid indices (-1) and apply filters to all candidates at once
+        keep = indices != -1
+        if filter_dict:
+            for field, value in filter_dict.items():
+                keep &= self._metadata_column(field)[indices] == value
         
-        # Format results and apply filters
-        formatted_results = []
-        for dist, idx in zip(distances[0], indices[0]):
-            if idx == -1:  # Invalid index
-                continue
-            
-            result = {
+        # Format results
+        return [
+            {
                 'text': self.documents[idx],
                 'metadata': self.metadatas[idx],
-                'distance': float(dist)
+                'distance': dist
             }
-            
-            # Apply filter if provided
-            if filter_dict:
-                matches = all(result['metadata'].get(k) == v for k, v in filter_dict.items())
-                if not matches:
-                    continue
-            
-            formatted_results.append(result)
-            
-            if len(formatted_results) >= n_results:
-                break
-        
-        return formatted_results
+            for dist, idx in zip(distances[keep][:n_results].tolist(), indices[keep][:n_results].tolist())
+        ]
     
     def get_context_for_query(self, query: str, max_results: int = 3) -> str:
         """
@@ -283,6 +519,8 @@ class DiscGolfKnowledgeBase:
         self.documents = []
         self.metadatas = []
         self.ids = []
+        self._metadata_columns = {}
+        self._query_neighbours = {}
         
         # Remove saved files
         index_path = os.path.join(self.db_path, "index.faiss")
@@ -315,6 +553,9 @@ class SimpleTextKnowledgeBase:
         if os.path.exists(text_file):
             with open(text_file, 'r', encoding='utf-8') as f:
                 self.content = f.read()
+        
+        # Lowercased once here rather than on every search
+        self.content_lower = self.content.lower()
     
     def search(self, query: str, context_window: int = 500) -> List[str]:
         """
@@ -331,7 +572,7 @@ class SimpleTextKnowledgeBase:
             return []
         
         query_lower = query.lower()
-        content_lower = self.content.lower()
+        content_lower = self.content_lower
         
         results = []
         start = 0
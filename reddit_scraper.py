@@ -5,11 +5,33 @@ Collects posts, comments, and recommendations from disc golf subreddits
 
 import praw
 import json
+from collections import deque
 from datetime import datetime
+from itertools import islice
 from typing import List, Dict
 import re
 
 
+# Common disc manufacturers, for extract_disc_mentions
+DISC_MANUFACTURERS = ('Innova', 'Discraft', 'Latitude 64', 'Dynamic Discs',
+                      'Westside', 'MVP', 'Axiom', 'Prodigy', 'Discmania',
+                      'Kastaplast', 'Gateway', 'Streamline', 'Lone Star',
+                      'Thought Space', 'RPM', 'DGA')
+
+_DISC_NAME_PATTERN = r'\s+([A-Z][a-z]+(?:\s+[A-Z0-9][a-z0-9]*)*)'
+_MANUFACTURER_RE = re.compile('|'.join(map(re.escape, DISC_MANUFACTURERS)))
+_MANUFACTURER_MAX_LEN = max(map(len, DISC_MANUFACTURERS))
+
+# Manufacturer + disc name for all manufacturers in one pass
+_DISC_MENTION_RE = re.compile(f'({_MANUFACTURER_RE.pattern}){_DISC_NAME_PATTERN}')
+
+# One pattern per manufacturer, for text where one match swallows another
+# manufacturer's mention
+_MANUFACTURER_MENTION_RES = tuple(
+    (mfr, re.compile(re.escape(mfr) + _DISC_NAME_PATTERN)) for mfr in DISC_MANUFACTURERS
+)
+
+
 class RedditDiscGolfScraper:
     """Scraper for disc golf content from Reddit"""
     
@@ -82,7 +104,7 @@ class RedditDiscGolfScraper:
             # Get top comments
             try:
                 submission.comments.replace_more(limit=0)  # Remove "load more"
-                for comment in submission.comments.list()[:20]:  # Top 20 comments
+                for comment in islice(self._iter_comments(submission.comments), 20):  # Top 20 comments
                     if isinstance(comment, praw.models.Comment):
                         comment_data = {
                             'author': str(comment.author),
@@ -97,6 +119,19 @@ class RedditDiscGolfScraper:
         
         return posts
     
+    @staticmethod
+    def _iter_comments(forest):
+        """
+        Comments in the same breadth-first order as CommentForest.list(),
+        but lazily, so taking the first few does not flatten the whole tree.
+        """
+        queue = deque(forest)
+        while queue:
+            comment = queue.popleft()
+            yield comment
+            if not isinstance(comment, praw.models.MoreComments):
+                queue.extend(comment.replies)
+    
     def scrape_disc_recommendations(self, limit: int = 500) -> List[Dict]:
         """
         Scrape posts specifically about disc recommendations and reviews.
@@ -151,21 +186,24 @@ class RedditDiscGolfScraper:
         Returns:
             List of potential disc names
         """
-        # Common disc manufacturers
-        manufacturers = ['Innova', 'Discraft', 'Latitude 64', 'Dynamic Discs', 
-                        'Westside', 'MVP', 'Axiom', 'Prodigy', 'Discmania',
-                        'Kastaplast', 'Gateway', 'Streamline', 'Lone Star',
-                        'Thought Space', 'RPM', 'DGA']
-        
-        disc_mentions = []
+        disc_mentions = set()
         
         # Pattern: Manufacturer + Disc Name
-        for mfr in manufacturers:
-            pattern = rf'{mfr}\s+([A-Z][a-z]+(?:\s+[A-Z0-9][a-z0-9]*)*)'
-            matches = re.findall(pattern, text)
-            disc_mentions.extend([f"{mfr} {match}" for match in matches])
+        for match in _DISC_MENTION_RE.finditer(text):
+            # A name running into another manufacturer ("Innova Destroyer
+            # Discraft Buzzz") hides that mention from the single pass, so
+            # search each manufacturer separately
+            nested = _MANUFACTURER_RE.search(text, match.start(2), match.end(2) + _MANUFACTURER_MAX_LEN)
+            if nested and nested.start() < match.end(2):
+                disc_mentions = {
+                    f"{mfr} {name}"
+                    for mfr, pattern in _MANUFACTURER_MENTION_RES
+                    for name in pattern.findall(text)
+                }
+                break
+            disc_mentions.add(f"{match.group(1)} {match.group(2)}")
         
-        return list(set(disc_mentions))
+        return list(disc_mentions)
     
     def save_to_file(self, posts: List[Dict], filename: str = 'reddit_discgolf_data.json'):
         """
@@ -1,23 +1,84 @@
+import threading
+import time
 import requests
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from urllib.parse import quote
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+# Stock lookups are reused for this long, per disc name (case-insensitive)
+STOCK_CACHE_TTL_SECONDS = 600
+STOCK_CACHE_SIZE = 2048
+
+# Disc name (lowercase) -> (expiry time, check_disc_tree_stock result)
+_stock_cache = {}
+_stock_cache_lock = threading.Lock()
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+
+# (connect, read) timeout in seconds for retailer requests
+REQUEST_TIMEOUT = (3.05, 5)
+
+# One session for all retailer lookups, so they reuse TCP/TLS connections;
+# the pool is as large as check_disc_tree_stock_many's default thread count.
+# Brief gateway errors are retried; a final error response is returned as is
+_session = requests.Session()
+_session.headers.update({'User-Agent': USER_AGENT})
+_session.mount("https://", HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=8,
+    max_retries=Retry(total=2, backoff_factor=0.2, status_forcelist=[502, 503, 504], raise_on_status=False)
+))
 
 
 def check_disc_tree_stock(disc_name):
     """
     Check if a disc is in stock at Disc Tree using Shopify's suggest API.
     
+    Results are cached for STOCK_CACHE_TTL_SECONDS; failed lookups are not.
+    
     Returns dict with:
-    - 'status': 'in_stock', 'sold_out', or 'not_found'
-    - 'url': Direct link to product (if found)
+    - 'status': 'in_stock', 'sold_out', 'not_found', or 'unknown' (lookup failed)
+    - 'url': Direct link to product (if found), or search page (if unknown)
     - 'price': Price in DKK (if found)
     - 'title': Full product name (if found)
     """
+    cached = _cached_disc_tree_stock(disc_name)
+    if cached is not None:
+        return cached
+    
+    result = _fetch_disc_tree_stock(disc_name)
+    if result['status'] != 'unknown':
+        key = disc_name.lower()
+        with _stock_cache_lock:
+            _stock_cache.pop(key, None)
+            _stock_cache[key] = (time.monotonic() + STOCK_CACHE_TTL_SECONDS, result)
+            if len(_stock_cache) > STOCK_CACHE_SIZE:
+                del _stock_cache[next(iter(_stock_cache))]
+    return dict(result)
+
+
+def _cached_disc_tree_stock(disc_name):
+    """Copy of the cached check_disc_tree_stock result, or None if missing or expired."""
+    with _stock_cache_lock:
+        cached = _stock_cache.get(disc_name.lower())
+    if cached is not None and cached[0] > time.monotonic():
+        return dict(cached[1])
+    return None
+
+
+def _fetch_disc_tree_stock(disc_name):
+    """Uncached check_disc_tree_stock."""
     try:
         # Use Shopify's suggest API
-        search_url = f"https://disctree.dk/search/suggest.json?q={disc_name}&resources[type]=product&resources[limit]=10"
-        response = requests.get(search_url, timeout=5)
+        search_url = f"https://disctree.dk/search/suggest.json?q={quote(disc_name)}&resources[type]=product&resources[limit]=10"
+        response = _session.get(search_url, timeout=REQUEST_TIMEOUT)
         
         if response.status_code != 200:
-            return {'status': 'not_found', 'url': None}
+            # Includes 5xx still failing after retries; not a real "not sold here"
+            return _unknown_disc_tree_stock(disc_name)
         
         data = response.json()
         products = data.get('resources', {}).get('results', {}).get('products', [])
@@ -27,18 +88,12 @@ def check_disc_tree_stock(disc_name):
         
         # Look for exact disc name match (ignore plastic type variations)
         disc_lower = disc_name.lower()
+        mold_tag = f'mold_{disc_lower}'
         
         for product in products:
-            title = product.get('title', '').lower()
-            tags = product.get('tags', [])
-            
-            # Check if Mold_ tag matches the disc name
-            mold_match = any(tag.lower() == f'mold_{disc_lower}' for tag in tags)
-            
-            # Or check if disc name is in title
-            name_in_title = disc_lower in title
-            
-            if mold_match or name_in_title:
+            # Disc name in the title, or a Mold_ tag matching the disc name
+            if (disc_lower in product.get('title', '').lower()
+                    or any(tag.lower() == mold_tag for tag in product.get('tags', []))):
                 available = product.get('available', False)
                 product_url = f"https://disctree.dk{product.get('url', '').split('?')[0]}"
                 price = product.get('price', '')
@@ -54,11 +109,36 @@ def check_disc_tree_stock(disc_name):
         return {'status': 'not_found', 'url': None}
         
     except Exception:
-        # On error, return search URL as fallback
-        return {
-            'status': 'unknown',
-            'url': f"https://disctree.dk/search?q={disc_name.replace(' ', '+')}"
-        }
+        return _unknown_disc_tree_stock(disc_name)
+
+
+def _unknown_disc_tree_stock(disc_name):
+    """Result for a failed lookup, with the search URL as fallback."""
+    return {
+        'status': 'unknown',
+        'url': f"https://disctree.dk/search?q={disc_name.replace(' ', '+')}"
+    }
+
+
+def check_disc_tree_stock_many(disc_names, max_workers=8):
+    """
+    Check Disc Tree stock for several discs concurrently.
+    
+    Duplicate names are only looked up once, and cached results are used
+    directly. The remaining lookups run in a thread pool, so total wait is
+    roughly the slowest request instead of the sum.
+    
+    Returns dict mapping disc name to check_disc_tree_stock() result.
+    """
+    results = {name: _cached_disc_tree_stock(name) for name in disc_names}
+    missing = [name for name, result in results.items() if result is None]
+    
+    if len(missing) == 1:
+        results[missing[0]] = check_disc_tree_stock(missing[0])
+    elif missing:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(missing))) as executor:
+            results.update(zip(missing, executor.map(check_disc_tree_stock, missing)))
+    return results
 
 
 def get_product_links(disc_name):
@@ -66,26 +146,41 @@ def get_product_links(disc_name):
     Gets search links from Danish stores.
     NewDisc only sells Axiom, MVP, and Streamline discs.
     """
+    return dict(_product_links(disc_name))
+
+
+@lru_cache(maxsize=2048)
+def get_product_links_markdown(disc_name):
+    """Store links for a disc as markdown, e.g. "[Disc Tree](...) | [NewDisc](...)"."""
+    return ' | '.join(f"[{store}]({url})" for store, url in _product_links(disc_name))
+
+
+# Molds NewDisc sells (it only carries Axiom, MVP and Streamline)
+_NEWDISC_MOLDS = frozenset({
+    # MVP
+    'volt', 'reactor', 'relay', 'servo', 'resistor', 'wave', 'impulse', 'inertia',
+    'photon', 'tesla', 'amp', 'anode', 'atom', 'ion', 'spin', 'proton', 'motion',
+    'octane', 'catalyst', 'dimension', 'limit', 'shock', 'deflector', 'vertex',
+    # Axiom
+    'insanity', 'crave', 'envy', 'proxy', 'hex', 'paradox', 'pyro', 'fireball',
+    'tenacity', 'excite', 'mayhem', 'tantrum', 'vanish', 'virus', 'wrath', 'clash',
+    'defy', 'time-lapse', 'rhythm',
+    # Streamline
+    'pilot', 'drift', 'trace', 'flare', 'stabilizer', 'runway', 'ascend', 'lift'
+})
+
+
+@lru_cache(maxsize=2048)
+def _product_links(disc_name):
+    """Cached store links for a disc, as a tuple of (store, url) pairs."""
     links = {}
+    query = disc_name.replace(' ', '+')
     
     # Disc Tree sells all brands
-    links['Disc Tree'] = f"https://disctree.dk/search?q={disc_name.replace(' ', '+')}"
+    links['Disc Tree'] = f"https://disctree.dk/search?q={query}"
     
     # NewDisc only sells Axiom, MVP, Streamline
-    mvp_axiom_streamline_discs = {
-        # MVP
-        'volt', 'reactor', 'relay', 'servo', 'resistor', 'wave', 'impulse', 'inertia',
-        'photon', 'tesla', 'amp', 'anode', 'atom', 'ion', 'spin', 'proton', 'motion',
-        'octane', 'catalyst', 'dimension', 'limit', 'shock', 'deflector', 'vertex',
-        # Axiom
-        'insanity', 'crave', 'envy', 'proxy', 'hex', 'paradox', 'pyro', 'fireball',
-        'tenacity', 'excite', 'mayhem', 'tantrum', 'vanish', 'virus', 'wrath', 'clash',
-        'defy', 'time-lapse', 'rhythm',
-        # Streamline
-        'pilot', 'drift', 'trace', 'flare', 'stabilizer', 'runway', 'ascend', 'lift'
-    }
-    
-    if disc_name.lower() in mvp_axiom_streamline_discs:
-        links['NewDisc'] = f"https://newdisc.dk/search?q={disc_name.replace(' ', '+')}*"
+    if disc_name.lower() in _NEWDISC_MOLDS:
+        links['NewDisc'] = f"https://newdisc.dk/search?q={query}*"
     
-    return links
\ No newline at end of file
+    return tuple(links.items())
@@ -555,7 +555,19 @@ def test_flight_chart():
             log_pass("get_flight_stats works", f"Max distance: {stats['max_distance_m']}m")
         else:
             log_fail("get_flight_stats", "Returns stats dict", str(stats))
-            
+
+        # Test flattening paths for the comparison chart
+        from flight_chart import transform_chart_paths
+        xs, dists, path_index, order = transform_chart_paths([path, path[:5]], mirror=False)
+        expected_dists = [round(p['y'] * 0.3048, 1) for p in path + path[:5]]
+        if (len(xs) == len(path) + 5 and xs[1] == -path[1]['x']
+                and dists.tolist() == expected_dists
+                and path_index[-1] == 1 and order[-1] == 4):
+            log_pass("transform_chart_paths works", f"{len(xs)} chart points")
+        else:
+            log_fail("transform_chart_paths", "Negated x, meters, path index and order",
+                     f"x={xs[:3]}, dist={dists[:3]}, index={path_index[-1]}, order={order[-1]}")
+
     except ImportError as e:
         log_fail("flight_chart.py imports", "Module loads", str(e))
     except Exception as e:
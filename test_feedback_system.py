@@ -323,6 +323,39 @@ def test_persistence():
         os.remove(test_file)
 
 
+# =============================================================================
+# TEST 8: Migration from the legacy .json file
+# =============================================================================
+def test_legacy_migration():
+    section("TEST 8: Migration from the legacy .json file")
+
+    from feedback_system import FeedbackSystem
+
+    legacy_file = "test_migration.json"
+    test_file = "test_migration.jsonl"
+
+    # Feedback file as written by older versions
+    with open(legacy_file, 'w', encoding='utf-8') as f:
+        json.dump({"feedback": [{"id": "fb_old", "question": "Old question", "response": "Old response", "rating": 4}]}, f)
+
+    # Appending before any read must not hide the legacy entries
+    fs1 = FeedbackSystem(test_file)
+    fs1.add_feedback(question="New question", response="New response", rating=5)
+
+    fs2 = FeedbackSystem(test_file)
+    ids = [entry["id"] for entry in fs2.get_all_feedback()]
+
+    if len(ids) == 2 and ids[0] == "fb_old":
+        log_pass("Legacy migration", f"Legacy entry kept: {len(ids)} entries")
+    else:
+        log_fail("Legacy migration", "fb_old plus 1 new entry", ids)
+
+    # Clean up
+    for path in (legacy_file, test_file):
+        if os.path.exists(path):
+            os.remove(path)
+
+
 # =============================================================================
 # RUN ALL TESTS
 # =============================================================================
@@ -340,6 +373,7 @@ def main():
     test_learning_examples(fs)
     test_export_training(fs)
     test_persistence()
+    test_legacy_migration()
     
     # Clean up test file
     if os.path.exists("test_feedback.json"):